@@ -0,0 +1,92 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Compares the former attribute filters of LogParser.summary_graph_df, a boolean mask over the whole table
+per filter followed by value_counts of the templates, with the AttributeIndex, which intersects the
+bitmaps or row positions of the values and counts the template ids of the matching rows.
+
+Usage: PYTHONPATH=. python benchmarks/bench_attribute_filter.py [n_rows]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from rdkone3b.preprocess.parsing_index import AttributeIndex, to_categorical
+from rdkone3b.utils import constants
+
+FILTERS = {
+    "Level": [("Level", "ERROR")],
+    "pid": [("pid", "1234")],
+    "Level, pid": [("Level", "ERROR"), ("pid", "1234")],
+    "Level, project": [("Level", "ERROR"), ("project", "WIFI.hal")],
+}
+
+
+def synthetic_results(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    templates = np.array(["template {} <*>".format(i) for i in range(500)], dtype=object)
+    return pd.DataFrame(
+        {
+            constants.PARSED_LOGLINE_NAME: to_categorical(
+                pd.Series(templates[rng.zipf(1.5, n_rows) % len(templates)])
+            ),
+            "Level": rng.choice(["INFO", "DEBUG", "WARN", "ERROR"], n_rows, p=[0.6, 0.2, 0.15, 0.05]),
+            "pid": rng.integers(1000, 3000, n_rows).astype(str),
+            "project": rng.choice(["WIFI.wifi", "WIFI.hal"], n_rows),
+        }
+    )
+
+
+def mask_counts(results: pd.DataFrame, filters: list) -> pd.Series:
+    """The former filtering of summary_graph_df."""
+    parsed_df = results
+    for k, v in filters:
+        parsed_df = parsed_df[parsed_df[k] == v]
+    counts = parsed_df[constants.PARSED_LOGLINE_NAME].value_counts()
+    return counts[counts > 0]
+
+
+def index_counts(results: pd.DataFrame, index: AttributeIndex, filters: list) -> pd.Series:
+    parsed_loglines = results[constants.PARSED_LOGLINE_NAME]
+    codes = parsed_loglines.cat.codes.to_numpy()[index.select(filters)]
+    counts = pd.Series(
+        np.bincount(codes[codes >= 0], minlength=len(parsed_loglines.cat.categories)),
+        index=parsed_loglines.cat.categories,
+    )
+    return counts[counts > 0]
+
+
+def main(n_rows: int):
+    results = synthetic_results(n_rows)
+    start = time.perf_counter()
+    index = AttributeIndex.from_dataframe(results[["Level", "pid", "project"]])
+    build_time = time.perf_counter() - start
+
+    print("{:>16} {:>10} {:>10} {:>8}".format("filters", "mask (s)", "index (s)", "speedup"))
+    for name, filters in FILTERS.items():
+        start = time.perf_counter()
+        expected = mask_counts(results, filters)
+        mask_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        counts = index_counts(results, index, filters)
+        index_time = time.perf_counter() - start
+
+        assert counts.sort_index().to_dict() == expected.sort_index().to_dict()
+        print(
+            "{:>16} {:>10.3f} {:>10.3f} {:>7.1f}x".format(
+                name, mask_time, index_time, mask_time / index_time
+            )
+        )
+    print("building the index of {} rows took {:.2f}s".format(n_rows, build_time))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000000)
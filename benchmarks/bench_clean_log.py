@@ -0,0 +1,78 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Compares the former Preprocessor.clean_log, which scans the column twice per replace pattern, with the
+CleaningPlan, which scans each line once per pattern, for growing numbers of lines and patterns.
+
+Usage: PYTHONPATH=. python benchmarks/bench_clean_log.py [n_lines]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from rdkone3b.preprocess.preprocessor import Preprocessor, PreprocessorConfig
+from rdkone3b.utils import constants
+from synthetic_logs import wifi_log_lines
+
+DELIMITERS = [r"[\[\]=,]"]
+REPLACE_LIST = [
+    (r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}", "<timestamp>"),
+    (r"([0-9a-f]{2}:){2}[0-9a-f]{2}", "<mac>"),
+    (r"Device\.WiFi\.\w+\.(\d+)", r"<param:\1>"),
+    (r"ap-(\d+)", "<ap>"),
+    (r"-\d+ dBm", "<noise>"),
+    (r"rssi -(\d+)", "<rssi>"),
+    (r"band (\d+)", "<band>"),
+    (r"retry \d+", "<retry>"),
+]
+
+
+def pattern_by_pattern(config: PreprocessorConfig, loglines: pd.Series):
+    """The former clean_log."""
+    cleaned_log = loglines
+    terms = pd.DataFrame()
+    for reg in config.custom_delimiters_regex:
+        cleaned_log = cleaned_log.replace(to_replace=reg, value=" ", regex=True)
+    for pattern, replacement in config.custom_replace_list:
+        terms[replacement] = cleaned_log.str.findall(pat=pattern)
+        cleaned_log = cleaned_log.replace(to_replace=pattern, value=replacement, regex=True)
+    return cleaned_log, terms
+
+
+def main(n_lines: int):
+    lines = wifi_log_lines(n_lines)
+    print("{:>10} {:>9} {:>12} {:>13} {:>8}".format("lines", "patterns", "former (s)", "one scan (s)", "speedup"))
+    for size in (n_lines // 10, n_lines):
+        loglines = pd.Series(lines[:size], name=constants.LOGLINE_NAME)
+        for n_patterns in (2, 4, 8):
+            config = PreprocessorConfig.from_dict(
+                {
+                    "custom_delimiters_regex": DELIMITERS,
+                    "custom_replace_list": REPLACE_LIST[:n_patterns],
+                }
+            )
+            start = time.perf_counter()
+            expected = pattern_by_pattern(config, loglines)
+            former_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            cleaned_log, terms = Preprocessor(config).clean_log(loglines)
+            one_scan_time = time.perf_counter() - start
+
+            pd.testing.assert_series_equal(cleaned_log, expected[0])
+            pd.testing.assert_frame_equal(terms, expected[1])
+            print(
+                "{:>10} {:>9} {:>12.3f} {:>13.3f} {:>7.1f}x".format(
+                    size, n_patterns, former_time, one_scan_time, former_time / one_scan_time
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
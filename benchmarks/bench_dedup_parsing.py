@@ -0,0 +1,52 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Compares LogParser.parse_logs mining every logline with the deduplicate mode, which preprocesses and
+mines only the unique loglines, on logs with a growing number of distinct messages.
+
+Usage: PYTHONPATH=. python benchmarks/bench_dedup_parsing.py [n_lines]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from rdkone3b.preprocess.log_parser import LogParser
+from synthetic_logs import wifi_log_lines, write_log_file
+
+
+class BenchLogParser(LogParser):
+    """LogParser reading the files of a given directory."""
+
+    def __init__(self, merged_logs_path, deduplicate):
+        super().__init__(deduplicate=deduplicate)
+        self.merged_logs_path = merged_logs_path
+
+
+def main(n_lines: int):
+    print("{:>10} {:>12} {:>14} {:>8}".format("unique", "all (s)", "unique (s)", "speedup"))
+    for n_unique in (100, 1000, 10000):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            write_log_file(
+                os.path.join(tmpdir, "WiFiLog.txt.0"), wifi_log_lines(n_lines, n_unique=n_unique)
+            )
+            timings = []
+            for deduplicate in (False, True):
+                parser = BenchLogParser(tmpdir, deduplicate)
+                start = time.perf_counter()
+                parser.parse_logs("WiFiLog.txt.0")
+                timings.append(time.perf_counter() - start)
+            print(
+                "{:>10} {:>12.2f} {:>14.2f} {:>7.1f}x".format(
+                    n_unique, timings[0], timings[1], timings[0] / timings[1]
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
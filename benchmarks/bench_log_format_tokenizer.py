@@ -0,0 +1,67 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Compares the regex and the split tokenizer of FileDataLoader per log format.
+
+Usage: PYTHONPATH=. python benchmarks/bench_log_format_tokenizer.py [n_lines]
+"""
+import sys
+import time
+
+from rdkone3b.preprocess.data_loader import FileDataLoader
+from synthetic_logs import wifi_log_lines
+
+# Log formats and a function to render a WiFiLog line in that format.
+FORMATS = {
+    "<DateTime> <project> <Level> <pid> <Content>": lambda parts: " ".join(parts),
+    "<DateTime> <Level> <Content>": lambda parts: " ".join([parts[0], parts[2], parts[4]]),
+    "<Content>": lambda parts: parts[4],
+    "<DateTime> <Level>: <Content>": lambda parts: "{} {}: {}".format(parts[0], parts[2], parts[4]),
+}
+
+
+def tokenize_regex(lines, headers, regex):
+    out = []
+    for line in lines:
+        match = regex.search(line.strip())
+        out.append([match.group(header) for header in headers])
+    return out
+
+
+def tokenize_split(lines, maxsplit):
+    return [line.strip().split(None, maxsplit) for line in lines]
+
+
+def main(n_lines: int):
+    raw = [line.split(None, 4) for line in wifi_log_lines(n_lines)]
+    print("{:<48} {:>10} {:>10} {:>8}".format("log_format", "regex (s)", "split (s)", "speedup"))
+    for log_format, render in FORMATS.items():
+        lines = [render(parts) for parts in raw]
+        headers, regex = FileDataLoader._generate_logformat_regex(log_format)
+        maxsplit = FileDataLoader._generate_logformat_maxsplit(log_format)
+
+        start = time.perf_counter()
+        expected = tokenize_regex(lines, headers, regex)
+        regex_time = time.perf_counter() - start
+
+        if maxsplit is None:
+            print("{:<48} {:>10.3f} {:>10} {:>8}".format(log_format, regex_time, "-", "regex"))
+            continue
+        start = time.perf_counter()
+        result = tokenize_split(lines, maxsplit)
+        split_time = time.perf_counter() - start
+        assert result == expected, "split tokenizer differs from regex for {}".format(log_format)
+        print(
+            "{:<48} {:>10.3f} {:>10.3f} {:>7.1f}x".format(
+                log_format, regex_time, split_time, regex_time / split_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,56 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Measures how Preprocessor.clean_log scales with PreprocessorConfig.num_workers, from 1 process up to
+the number of CPU cores.
+
+Usage: PYTHONPATH=. python benchmarks/bench_parallel_clean_log.py [n_lines] [max_workers]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+from rdkone3b.preprocess.preprocessor import Preprocessor, PreprocessorConfig
+from rdkone3b.utils import constants
+from bench_clean_log import DELIMITERS, REPLACE_LIST
+from synthetic_logs import wifi_log_lines
+
+
+def main(n_lines: int, max_workers: int):
+    loglines = pd.Series(wifi_log_lines(n_lines), name=constants.LOGLINE_NAME)
+    loglines.index = loglines.index * 2
+    workers = sorted({1, 2, 4, 8, 16, max_workers} & set(range(1, max_workers + 1)))
+
+    print("{:>8} {:>10} {:>8}".format("workers", "time (s)", "speedup"))
+    expected = None
+    for num_workers in workers:
+        config = PreprocessorConfig.from_dict(
+            {
+                "custom_delimiters_regex": DELIMITERS,
+                "custom_replace_list": REPLACE_LIST,
+                "num_workers": num_workers,
+            }
+        )
+        start = time.perf_counter()
+        cleaned_log, terms = Preprocessor(config).clean_log(loglines)
+        elapsed = time.perf_counter() - start
+
+        if expected is None:
+            expected, serial_time = (cleaned_log, terms), elapsed
+        pd.testing.assert_series_equal(cleaned_log, expected[0])
+        pd.testing.assert_frame_equal(terms, expected[1])
+        print("{:>8} {:>10.2f} {:>7.1f}x".format(num_workers, elapsed, serial_time / elapsed))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1,
+    )
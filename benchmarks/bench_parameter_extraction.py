@@ -0,0 +1,80 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Compares the former row-wise LogParser.get_parameter_list and drain3's TemplateMiner.get_parameter_list
+with the ParameterExtractor, which extracts the parameters of all loglines of a template by position,
+and checks that the ParameterExtractor gives the same parameters as drain3, with and without masking.
+
+Usage: PYTHONPATH=. python benchmarks/bench_parameter_extraction.py [n_lines]
+"""
+import sys
+import time
+
+import pandas as pd
+from drain3 import TemplateMiner
+from drain3.masking import MaskingInstruction
+from drain3.template_miner_config import TemplateMinerConfig
+
+from rdkone3b.preprocess.log_parser import LogParser
+from rdkone3b.preprocess.parameter_extractor import ParameterExtractor
+from rdkone3b.utils import constants
+from synthetic_logs import wifi_log_lines
+
+
+def drain_configs():
+    plain = TemplateMinerConfig()
+    masked = TemplateMinerConfig()
+    masked.drain_extra_delimiters = [":"]
+    masked.masking_instructions = [
+        MaskingInstruction(r"-\d+", "NEG"),
+        MaskingInstruction(r"ap-\d+", "AP"),
+    ]
+    return {"plain": plain, "masked": masked}
+
+
+def main(n_lines: int):
+    # Some loglines with whitespace at the ends, which drain3 matches into the parameters.
+    lines = [
+        " " + line if i % 97 == 0 else line for i, line in enumerate(wifi_log_lines(n_lines))
+    ]
+    loglines = pd.Series(lines, name=constants.LOGLINE_NAME)
+    print(
+        "{:>8} {:>12} {:>11} {:>14} {:>8}".format(
+            "config", "former (s)", "drain3 (s)", "positional (s)", "speedup"
+        )
+    )
+    for name, config in drain_configs().items():
+        miner = TemplateMiner(config=config)
+        templates = pd.Series(
+            [miner.add_log_message(line)["template_mined"] for line in lines],
+            name=constants.PARSED_LOGLINE_NAME,
+        )
+        rows = pd.concat([loglines, templates], axis=1)
+
+        start = time.perf_counter()
+        rows.apply(LogParser.get_parameter_list, axis=1)
+        former_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = [miner.get_parameter_list(t, line) for t, line in zip(templates, lines)]
+        drain_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parameters = ParameterExtractor(miner).extract(loglines, templates)
+        positional_time = time.perf_counter() - start
+
+        assert parameters == expected
+        print(
+            "{:>8} {:>12.2f} {:>11.2f} {:>14.2f} {:>7.1f}x".format(
+                name, former_time, drain_time, positional_time, drain_time / positional_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,78 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Compares the former LogParser.get_dynamic_parameter_list, which transposes the parameter lists of all
+rows of a pattern on every call, with the summaries of the ParameterStore built once per parse, for a
+pattern with many occurrences.
+
+Usage: PYTHONPATH=. python benchmarks/bench_parameter_summary.py [n_rows]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from rdkone3b.preprocess.parsing_index import ParameterStore, TemplateIndex, to_categorical
+
+TEMPLATE = "client <*> connected to vap <*> band <*>"
+
+
+def synthetic_parameters(n_rows: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    macs = np.array(["{:02x}:{:02x}:{:02x}".format(*rng.integers(0, 256, 3)) for _ in range(5000)])
+    return pd.Series(
+        np.stack(
+            [
+                macs[rng.integers(0, len(macs), n_rows)],
+                rng.integers(0, 256, n_rows).astype(str),
+                rng.choice(["2", "5", "6"], n_rows),
+            ],
+            axis=1,
+        ).tolist()
+    )
+
+
+def transpose_summary(parameters: pd.Series) -> pd.DataFrame:
+    """The former get_dynamic_parameter_list, with the distinct values the pattern page shows."""
+    para_list = pd.DataFrame(None, columns=["position", "value_counts", "values"])
+    para_list["values"] = pd.Series(pd.DataFrame(parameters.tolist()).T.values.tolist())
+    para_list["position"] = ["POSITION_{}".format(v) for v in para_list.index.values]
+    para_list["value_counts"] = [len(list(filter(None, v))) for v in para_list["values"]]
+    para_list["values"] = para_list["values"].apply(lambda x: set(filter(None, x)))
+    return para_list
+
+
+def main(n_rows: int):
+    parameters = synthetic_parameters(n_rows)
+    templates = to_categorical(pd.Series([TEMPLATE] * n_rows))
+
+    start = time.perf_counter()
+    expected = transpose_summary(parameters)
+    transpose_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = TemplateIndex.from_categorical(templates)
+    store = ParameterStore.from_lists(parameters, templates.cat.codes, len(index))
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    summary = store.summary(index.template_id(TEMPLATE), max_values=100)
+    summary_time = time.perf_counter() - start
+
+    full_summary = store.summary(index.template_id(TEMPLATE))
+    assert list(full_summary["position"]) == list(expected["position"])
+    assert list(full_summary["value_counts"]) == list(expected["value_counts"])
+    assert [set(v) for v in full_summary["values"]] == list(expected["values"])
+    assert all(len(v) <= 100 for v in summary["values"])
+    print("{:>10} {:>14} {:>14} {:>12}".format("rows", "transpose (s)", "store build (s)", "summary (s)"))
+    print("{:>10} {:>14.3f} {:>15.3f} {:>12.5f}".format(n_rows, transpose_time, build_time, summary_time))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,74 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Compares row-wise and vectorized assembly of multi-column body and timestamp fields in
+FileDataLoader._create_log_record_object.
+
+Usage: PYTHONPATH=. python benchmarks/bench_record_assembly.py [n_lines]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from rdkone3b.preprocess.data_loader import DataLoaderConfig, FileDataLoader
+from rdkone3b.utils import constants
+from synthetic_logs import wifi_log_lines, write_log_file
+
+LOG_FORMAT = "<Date> <Time> <project> <Level> <pid> <Content>"
+
+
+def rowwise_join(df: pd.DataFrame, name: str) -> pd.Series:
+    """The former row-wise assembly."""
+    return df.agg(lambda x: " ".join(x.values), axis=1).rename(name)
+
+
+def main(n_lines: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lines = [line.replace("T", " ", 1) for line in wifi_log_lines(n_lines)]
+        fpath = write_log_file(os.path.join(tmpdir, "WiFiLog.txt.0"), lines)
+        config = DataLoaderConfig.from_dict(
+            {
+                "reader_args": {"log_format": LOG_FORMAT},
+                "dimensions": {
+                    "timestamp": ["Date", "Time"],
+                    "body": ["project", "Content"],
+                    "attributes": ["Level", "pid"],
+                },
+            }
+        )
+        loader = FileDataLoader(fpath, config)
+        df = loader._read_logs()
+
+    print("{:<24} {:>12} {:>14} {:>8}".format("joined columns", "row-wise (s)", "vectorized (s)", "speedup"))
+    for name, columns in [
+        ("project+Content", ["project", "Content"]),
+        ("Date+Time", ["Date", "Time"]),
+        ("all columns", list(df.columns)),
+    ]:
+        start = time.perf_counter()
+        expected = rowwise_join(df[columns], constants.LOGLINE_NAME)
+        rowwise_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        config.dimensions = {"body": columns} if name != "all columns" else {}
+        record = loader._create_log_record_object(df)
+        vectorized_time = time.perf_counter() - start
+
+        assert record.body[constants.LOGLINE_NAME].equals(expected)
+        print(
+            "{:<24} {:>12.3f} {:>14.3f} {:>7.1f}x".format(
+                name, rowwise_time, vectorized_time, rowwise_time / vectorized_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
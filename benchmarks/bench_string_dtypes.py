@@ -0,0 +1,72 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Compares the memory taken by the loaded log record object and the parsing result table with
+Python string objects and with Arrow-backed strings (DataLoaderConfig.string_dtype).
+
+Usage: PYTHONPATH=. python benchmarks/bench_string_dtypes.py [n_lines]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from rdkone3b.preprocess.log_parser import LogParser
+from synthetic_logs import wifi_log_lines, write_log_file
+
+STRING_DTYPES = [None, "pyarrow", "string[pyarrow]"]
+
+
+class BenchLogParser(LogParser):
+    """LogParser reading the files of a given directory with a given string dtype."""
+
+    def __init__(self, merged_logs_path, string_dtype):
+        super().__init__()
+        self.merged_logs_path = merged_logs_path
+        self.string_dtype = string_dtype
+        self.log_record_object = None
+
+    def _load_config(self, filename):
+        super()._load_config(filename)
+        self.config.data_loader_config.string_dtype = self.string_dtype
+
+    def _load_data(self, filename):
+        self.log_record_object = super()._load_data(filename)
+        return self.log_record_object
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def main(n_lines: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_log_file(os.path.join(tmpdir, "WiFiLog.txt.0"), wifi_log_lines(n_lines))
+        print(
+            "{:<18} {:>16} {:>16} {:>10}".format(
+                "string_dtype", "record (MB)", "results (MB)", "time (s)"
+            )
+        )
+        for string_dtype in STRING_DTYPES:
+            parser = BenchLogParser(tmpdir, string_dtype)
+            start = time.perf_counter()
+            parser.parse_logs("WiFiLog.txt.0")
+            elapsed = time.perf_counter() - start
+            record = parser.log_record_object.to_dataframe()
+            print(
+                "{:<18} {:>16.1f} {:>16.1f} {:>10.2f}".format(
+                    str(string_dtype),
+                    memory_mb(record),
+                    memory_mb(parser.result_table),
+                    elapsed,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
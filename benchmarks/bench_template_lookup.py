@@ -0,0 +1,64 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Compares selecting the rows of a log pattern by comparing the parsed logline column with the pattern,
+as the pattern callbacks did on every click, with the TemplateIndex of the parsing results.
+
+Usage: PYTHONPATH=. python benchmarks/bench_template_lookup.py [n_lines]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from rdkone3b.preprocess.log_parser import LogParser
+from rdkone3b.utils import constants
+from synthetic_logs import wifi_log_lines, write_log_file
+
+
+class BenchLogParser(LogParser):
+    """LogParser reading the files of a given directory."""
+
+    def __init__(self, merged_logs_path):
+        super().__init__(deduplicate=True)
+        self.merged_logs_path = merged_logs_path
+
+
+def main(n_lines: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_log_file(os.path.join(tmpdir, "WiFiLog.txt.0"), wifi_log_lines(n_lines))
+        parser = BenchLogParser(tmpdir)
+        parser.parse_logs("WiFiLog.txt.0")
+
+    results = parser.result_table
+    parsed_loglines = results[constants.PARSED_LOGLINE_NAME]
+    templates = parsed_loglines.astype(parsed_loglines.cat.categories.dtype)
+    patterns = parser.log_patterns
+
+    start = time.perf_counter()
+    expected = [results[templates == pattern] for pattern in patterns]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    selected = [results.iloc[parser.template_positions(pattern)] for pattern in patterns]
+    index_time = time.perf_counter() - start
+
+    for rows, expected_rows in zip(selected, expected):
+        assert np.array_equal(rows.index, expected_rows.index)
+    print("{:>10} {:>9} {:>10} {:>11} {:>8}".format("lines", "patterns", "scan (s)", "index (s)", "speedup"))
+    print(
+        "{:>10} {:>9} {:>10.3f} {:>11.3f} {:>7.1f}x".format(
+            n_lines, len(patterns), scan_time, index_time, scan_time / index_time
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
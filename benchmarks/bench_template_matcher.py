@@ -0,0 +1,96 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Compares classifying recurring loglines with TemplateMiner.add_log_message, one logline at a time, with
+the TemplateMatcher of the match-only mode of LogParser, on the templates learned from earlier traffic
+of the same log type. Checks that every logline the TemplateMatcher classifies gets the cluster Drain
+assigns it.
+
+Usage: PYTHONPATH=. python benchmarks/bench_template_matcher.py [n_lines]
+"""
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from drain3 import TemplateMiner
+from drain3.template_miner_config import TemplateMinerConfig
+
+from rdkone3b.preprocess.template_matcher import TemplateMatcher
+from synthetic_logs import wifi_log_lines
+
+PAM_MESSAGES = [
+    "pam_unix(sshd:session): session opened for user {user} by (uid={uid})",
+    "pam_unix(sshd:session): session closed for user {user}",
+    "pam_unix(sshd:auth): authentication failure; logname= uid={uid} euid={uid} tty=ssh ruser= rhost={host}",
+    "pam_unix(login:auth): check pass; user {user}",
+    "pam_systemd(sshd:session): Failed to create session: {error}",
+]
+PAM_USERS = ["root", "admin", "rdk", "guest", "operator"]
+PAM_ERRORS = ["Connection timed out", "No such file or directory", "Access denied"]
+
+
+def pam_log_lines(n_lines: int, seed: int = 0):
+    """Generates PAMlog messages."""
+    rng = random.Random(seed)
+    return [
+        rng.choice(PAM_MESSAGES).format(
+            user=rng.choice(PAM_USERS),
+            uid=rng.randint(0, 1000),
+            host="10.0.{}.{}".format(rng.randint(0, 9), rng.randint(1, 254)),
+            error=rng.choice(PAM_ERRORS),
+        )
+        for _ in range(n_lines)
+    ]
+
+
+def wifi_contents(n_lines: int, seed: int = 0):
+    """The contents of WiFiLog lines, after the datetime, project, level and pid."""
+    return [line.split(" ", 4)[4] for line in wifi_log_lines(n_lines, seed=seed, n_unique=2000)]
+
+
+def trained_miner(lines):
+    miner = TemplateMiner(config=TemplateMinerConfig())
+    for line in lines:
+        miner.add_log_message(line)
+    return miner
+
+
+def main(n_lines: int):
+    print(
+        "{:>8} {:>9} {:>10} {:>12} {:>12} {:>8}".format(
+            "log", "lines", "matched", "mining (s)", "matcher (s)", "speedup"
+        )
+    )
+    for name, generate in (("WiFiLog", wifi_contents), ("PAMlog", pam_log_lines)):
+        history = generate(n_lines // 4, seed=1)
+        lines = generate(n_lines, seed=2)
+
+        miner = trained_miner(history)
+        start = time.perf_counter()
+        expected = np.array([miner.add_log_message(line)["cluster_id"] for line in lines])
+        mining_time = time.perf_counter() - start
+
+        miner = trained_miner(history)
+        start = time.perf_counter()
+        codes, uniques = pd.factorize(pd.Series(lines))
+        cluster_ids = TemplateMatcher(miner).match(list(uniques))[codes]
+        matcher_time = time.perf_counter() - start
+
+        matched = cluster_ids >= 0
+        assert np.array_equal(cluster_ids[matched], expected[matched])
+        print(
+            "{:>8} {:>9} {:>9.1%} {:>12.3f} {:>12.3f} {:>7.1f}x".format(
+                name, n_lines, matched.mean(), mining_time, matcher_time, mining_time / matcher_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
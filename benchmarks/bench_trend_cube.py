@@ -0,0 +1,84 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Compares the trend of a log pattern computed by grouping its rows with pd.Grouper, as the pattern
+callbacks did on every click and interval change, with slicing the TrendCube built once per parse.
+
+Usage: PYTHONPATH=. python benchmarks/bench_trend_cube.py [n_lines]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from rdkone3b.preprocess.log_parser import LogParser
+from rdkone3b.preprocess.parsing_index import TREND_FREQUENCIES, TrendCube
+from rdkone3b.utils import constants
+from synthetic_logs import wifi_log_lines, write_log_file
+
+
+class BenchLogParser(LogParser):
+    """LogParser reading the files of a given directory."""
+
+    def __init__(self, merged_logs_path):
+        super().__init__(deduplicate=True)
+        self.merged_logs_path = merged_logs_path
+
+
+def grouper_trend(results: pd.DataFrame, positions, freq: str) -> pd.DataFrame:
+    """The former trend computation of update_y_timeseries."""
+    dff = results.iloc[positions][[constants.LOG_TIMESTAMPS, constants.PARSED_LOGLINE_NAME]]
+    return (
+        dff.groupby(pd.Grouper(key=constants.LOG_TIMESTAMPS, freq=freq, offset=0, label="right"))
+        .size()
+        .reset_index(name="count")
+    )
+
+
+def main(n_lines: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_log_file(os.path.join(tmpdir, "WiFiLog.txt.0"), wifi_log_lines(n_lines))
+        parser = BenchLogParser(tmpdir)
+        parser.parse_logs("WiFiLog.txt.0")
+
+    results = parser.result_table
+    patterns = parser.log_patterns
+    start = time.perf_counter()
+    TrendCube.from_timestamps(
+        results[constants.PARSED_LOGLINE_NAME].cat.codes,
+        results[constants.LOG_TIMESTAMPS_NS],
+        len(patterns),
+    )
+    build_time = time.perf_counter() - start
+
+    print("{:>6} {:>9} {:>12} {:>10} {:>8}".format("freq", "patterns", "grouper (s)", "cube (s)", "speedup"))
+    for freq in TREND_FREQUENCIES:
+        start = time.perf_counter()
+        expected = [
+            grouper_trend(results, parser.template_positions(pattern), freq) for pattern in patterns
+        ]
+        grouper_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        trends = [parser.get_trend(pattern, freq) for pattern in patterns]
+        cube_time = time.perf_counter() - start
+
+        for trend, expected_trend in zip(trends, expected):
+            pd.testing.assert_frame_equal(trend, expected_trend)
+        print(
+            "{:>6} {:>9} {:>12.4f} {:>10.4f} {:>7.1f}x".format(
+                freq, len(patterns), grouper_time, cube_time, grouper_time / cube_time
+            )
+        )
+    print("building the cube of {} rows took {:.4f}s".format(len(results), build_time))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
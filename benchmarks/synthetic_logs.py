@@ -0,0 +1,60 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+"""
+Synthetic RDK style log lines shared by the benchmarks.
+"""
+import random
+from datetime import datetime, timedelta
+
+WIFI_LOG_FORMAT = "<DateTime> <project> <Level> <pid> <Content>"
+
+MESSAGES = [
+    "wifi_health: radio {} channel {} noise -{} dBm",
+    "client {:02x}:{:02x}:{:02x} connected to vap {}",
+    "Received beacon from ap-{} rssi -{}",
+    "CcspWifiSsp: Device.WiFi.Radio.{}.Enable param set ok",
+    "failed to read Device.WiFi.SSID.{}.Status retry {}",
+    "wifi_api: sta {} steering from band {} to band {} reason {}",
+]
+LEVELS = ["INFO", "INFO", "INFO", "DEBUG", "ERROR"]
+
+
+def wifi_log_lines(n_lines: int, seed: int = 0, n_unique: int = None):
+    """
+    Generates WiFiLog lines in `WIFI_LOG_FORMAT`.
+
+    :param n_lines: The number of lines to generate.
+    :param seed: The random seed.
+    :param n_unique: If set, lines are drawn from this many distinct messages to mimic repetitive logs.
+    :return: A list of log lines without trailing newlines.
+    """
+    rng = random.Random(seed)
+
+    def message():
+        msg = rng.choice(MESSAGES)
+        return msg.format(*[rng.randint(0, 255) for _ in range(msg.count("{"))])
+
+    pool = [message() for _ in range(n_unique)] if n_unique else None
+    start = datetime(2025, 7, 26, 10, 0, 0)
+    lines = []
+    for i in range(n_lines):
+        ts = (start + timedelta(seconds=i // 20)).strftime("%Y-%m-%dT%H:%M:%S")
+        content = rng.choice(pool) if pool else message()
+        lines.append(
+            "{} WIFI.{} {} {} {}".format(
+                ts, rng.choice(["wifi", "hal"]), rng.choice(LEVELS), rng.randint(1000, 1010), content
+            )
+        )
+    return lines
+
+
+def write_log_file(fpath: str, lines):
+    with open(fpath, "w") as f:
+        for line in lines:
+            f.write(line + "\n")
+    return fpath
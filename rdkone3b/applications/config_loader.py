@@ -31,15 +31,18 @@ class ConfigIndex:
         entries = [ConfigEntry(**entry) for entry in raw_data.get("supported_files", [])]
         return ConfigIndex(supported_files=entries)
 
-    def find_config_for_file(self, filename: str) -> str:
+    def find_entry_for_file(self, filename: str) -> ConfigEntry:
         filename_base = os.path.basename(filename)
 
         for entry in self.supported_files:
             for supported_name in entry.supported_files:
                 if supported_name.lower() in filename_base.lower():
-                    return entry.supported_config
+                    return entry
         raise ValueError(f"No config found for file: {filename}")
 
+    def find_config_for_file(self, filename: str) -> str:
+        return self.find_entry_for_file(filename).supported_config
+
 @dataclass
 class ConfigLoader(Config):
     """config class for end to end workflow.
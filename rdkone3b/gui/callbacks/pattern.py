@@ -8,7 +8,6 @@
 import os
 import dash
 import base64
-import pandas as pd
 import plotly.express as px
 
 from dash import html, Input, Output, State, callback, dash_table, ctx, ALL
@@ -18,8 +17,11 @@ import dash_bootstrap_components as dbc
 from rdkone3b.preprocess.log_parser import LogParser
 from rdkone3b.preprocess.uploaded_file_processor import UPloadedFilesProcessor
 from rdkone3b.gui.pages.utils import UPLOAD_DIRECTORY
+from rdkone3b.utils.constants import DRAIN_STATE_DIRECTORY, PARSE_CACHE_DIRECTORY
 
-PARSING_APP = LogParser()
+PARSING_APP = LogParser(state_dir=DRAIN_STATE_DIRECTORY, cache_dir=PARSE_CACHE_DIRECTORY)
+# The most frequent values of a parameter position listed in the dynamic parameter table.
+MAX_PARAMETER_VALUES = 100
 
 def create_attribute_component(attributes):
     table = dash_table.DataTable(
@@ -216,11 +218,16 @@ def update_log_pattern(data):
 def update_dynamic_lists(data):
     if data is not None:
         df = PARSING_APP.get_dynamic_parameter_list(
-            data["points"][0]["customdata"]
+            data["points"][0]["customdata"], max_values=MAX_PARAMETER_VALUES
         )
-        df["values"] = df["values"].apply(lambda x: ", ".join(set(filter(None, x))))
+        df["values"] = df["values"].apply(", ".join)
         df = df.rename(
-            columns={"position": "Position", "value_counts": "Count", "values": "Value"}
+            columns={
+                "position": "Position",
+                "value_counts": "Count",
+                "distinct_counts": "Distinct",
+                "values": "Value",
+            }
         )
         columns = [{"name": c, "id": c} for c in df.columns]
         return dash_table.DataTable(
@@ -304,17 +311,7 @@ def update_y_timeseries(data, interval):
     interval_map = {0: "1s", 1: "1min", 2: "1h", 3: "1d"}
     pattern = data["points"][0]["customdata"]
     freq = interval_map[interval]
-    result_df = PARSING_APP.result_table
-    dff = result_df[result_df["parsed_logline"] == pattern][
-        ["timestamp", "parsed_logline"]
-    ]
-
-    ts_df = (
-        dff[["timestamp", "parsed_logline"]]
-        .groupby(pd.Grouper(key="timestamp", freq=freq, offset=0, label="right"))
-        .size()
-        .reset_index(name="count")
-    )
+    ts_df = PARSING_APP.get_trend(pattern, freq)
 
     title = "Trend of Occurrence at Freq({})".format(freq)
     return create_time_series(ts_df, "Linear", title)
@@ -346,7 +343,7 @@ def summary(data):
     if len(data) > 0:
         result_table = PARSING_APP.result_table
         total_loglines = result_table.shape[0]
-        total_log_patterns = len(result_table["parsed_logline"].unique())
+        total_log_patterns = len(PARSING_APP.log_patterns)
 
         return html.Div(
             [
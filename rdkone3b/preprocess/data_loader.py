@@ -5,14 +5,22 @@
 # For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
 #
 #
+import contextlib
+import io
+import itertools
 import logging
+import multiprocessing
+import os
 import re
+from collections import namedtuple
+from functools import partial
 
 import pandas as pd
 from dataclasses import dataclass, field
 
 from rdkone3b.utils.config_util import Config
-from rdkone3b.preprocess.data_model import LogRecordObject
+from rdkone3b.preprocess.data_model import LogRecordObject, get_string_dtype, join_columns
+from rdkone3b.preprocess.preprocessor import TimestampParser
 from rdkone3b.utils import constants
 
 
@@ -20,11 +28,65 @@ from rdkone3b.utils import constants
 class DataLoaderConfig(Config):
     """
     The configuration class of data loader.
+
+    :param infer_datetime: Whether timestamps are parsed with `datetime_format` as is. Otherwise the
+        datetime format is detected from a sample of the timestamps, trying `datetime_format` first,
+        and the timestamps are kept as strings if no format parses them.
+    :param chunk_size: The number of log lines held in memory at a time when streaming the file,
+        0 reads the whole file as a single chunk.
+    :param num_workers: The number of processes parsing newline-aligned byte ranges of the file
+        in parallel, 1 parses the file in the current process.
+    :param range_size: The size in bytes of the byte ranges parsed by each worker.
+    :param encoding: The encoding of the log file.
+    :param encoding_errors: How undecodable bytes are handled, "replace" substitutes them with U+FFFD
+        so that a corrupted line does not abort the whole file.
+    :param reject_file: The path of a sidecar file to write the lines not matching log_format to.
+    :param merge_continuation: Whether lines not matching log_format are appended, newline separated,
+        to the last field of the previous record as continuation of multi-line messages.
+    :param string_dtype: The dtype of the string fields, None for Python string objects, "pyarrow" or
+        "string[pyarrow]" for Arrow-backed strings, which take far less memory.
+    :param encode_body: Whether the body loglines are dictionary-encoded into a categorical column,
+        storing each distinct logline of repetitive logs once.
     """
     dimensions: dict = field(default_factory=dict)
     reader_args: dict = field(default_factory=dict)
     infer_datetime: bool = False
     datetime_format: str = "%Y-%m-%dT%H:%M:%SZ"  # Default the ISO 8601 format example 2022-05-26T21:29:09+00:00
+    chunk_size: int = 0
+    num_workers: int = 1
+    range_size: int = 64 * 1024 * 1024
+    encoding: str = "utf-8"
+    encoding_errors: str = "replace"
+    reject_file: str = None
+    merge_continuation: bool = False
+    string_dtype: str = None
+    encode_body: bool = False
+
+
+@dataclass
+class LoadStats:
+    """
+    Line counters of a log file load.
+
+    :param total_lines: The number of lines read from the file.
+    :param parsed_lines: The number of lines matching log_format.
+    :param rejected_lines: The number of lines not matching log_format that were dropped.
+    :param continuation_lines: The number of lines not matching log_format that were merged into
+        the previous record.
+    """
+    total_lines: int = 0
+    parsed_lines: int = 0
+    rejected_lines: int = 0
+    continuation_lines: int = 0
+
+    def update(self, other: "LoadStats"):
+        self.total_lines += other.total_lines
+        self.parsed_lines += other.parsed_lines
+        self.rejected_lines += other.rejected_lines
+        self.continuation_lines += other.continuation_lines
+
+
+_ParsedChunk = namedtuple("_ParsedChunk", ["df", "stats", "rejected", "leading"])
 
 
 class FileDataLoader:
@@ -38,6 +100,13 @@ class FileDataLoader:
         """
         self.config = config
         self.fpath = fpath
+        self.stats = LoadStats()
+        if config.infer_datetime:
+            self.timestamp_parser = TimestampParser(config.datetime_format)
+        else:
+            self.timestamp_parser = TimestampParser(
+                candidate_formats=[config.datetime_format] + constants.DATETIME_FORMATS
+            )
 
     def load_data(self) -> LogRecordObject:
         """
@@ -47,24 +116,40 @@ class FileDataLoader:
         - tsv
         - other plain text format such as .log with proper parsing configurations
 
-        :return: The logs read from log files and converted into LogRecordObject.
+        :return: The logs read from log files and converted into LogRecordObject. The line counters
+            of the load are available in `stats` afterwards.
         """
         df = self._read_logs()
         return self._create_log_record_object(df)
 
+    def load_data_chunks(self):
+        """
+        Loads log data chunk by chunk, holding at most `chunk_size` log lines in memory.
+
+        :return: A generator of LogRecordObject, one per chunk, indexed by the position of the
+            log line in the whole file.
+        """
+        for df in self._iter_log_chunks():
+            yield self._create_log_record_object(df)
+
     def _read_logs(self):
+        chunks = list(self._iter_log_chunks())
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks)
+
+    def _iter_log_chunks(self):
         print(f"Reading log file {self.fpath} with log format {self.config.reader_args.get('log_format', 'default')}")
         if "log_format" not in self.config.reader_args.keys():
             raise RuntimeError("log_format is needed to read free-form-text logs.")
         log_format = self.config.reader_args["log_format"]
 
-        df = self._log_to_dataframe(self.fpath, log_format)
-
-        return df
+        yield from self._log_to_dataframe(self.fpath, log_format)
 
-    def _log_to_dataframe(self, fpath, log_format):
+    @staticmethod
+    def _generate_logformat_regex(log_format):
         """
-        Function to transform log file to dataframe.
+        Function to generate regular expression to split log messages.
         """
         headers = []
         splitters = re.split(r"(<[^<>]+>)", log_format)
@@ -78,24 +163,114 @@ class FileDataLoader:
                 regex += "(?P<%s>.*?)" % header
                 headers.append(header)
         regex = re.compile("^" + regex + "$")
+        return headers, regex
+
+    @staticmethod
+    def _generate_logformat_maxsplit(log_format):
+        """
+        Function to detect log formats made of whitespace separated fields only, such as
+        `<DateTime> <project> <Level> <pid> <Content>`. Lines of such formats are tokenized with
+        `str.split(maxsplit=n)`, which yields the same fields as the lazy regex without backtracking.
+
+        :return: The maxsplit to tokenize lines with, or None if the format needs the regex.
+        """
+        splitters = re.split(r"(<[^<>]+>)", log_format)
+        if splitters[0] or splitters[-1]:
+            return None
+        for splitter in splitters[2:-1:2]:
+            if not re.fullmatch(" +", splitter):
+                return None
+        return len(splitters) // 2 - 1
+
+    def _log_to_dataframe(self, fpath, log_format):
+        """
+        Function to transform log file to dataframes, one per chunk or byte range.
+        """
+        headers, regex = self._generate_logformat_regex(log_format)
+        maxsplit = self._generate_logformat_maxsplit(log_format)
+
+        if self.config.num_workers > 1:
+            chunks = self._parse_byte_ranges(fpath, headers, regex, maxsplit)
+        else:
+            chunks = self._parse_line_chunks(fpath, headers, regex, maxsplit)
+
+        self.stats = LoadStats()
+        reject_out = None
+        if self.config.reject_file:
+            reject_out = open(
+                self.config.reject_file, "w", encoding=self.config.encoding
+            )
+        try:
+            start = 0
+            previous = None
+            for chunk in chunks:
+                self.stats.update(chunk.stats)
+                if chunk.leading:
+                    # Continuation lines at the head of a chunk belong to the last record of the
+                    # previous chunk, which is held back until then.
+                    if previous is not None:
+                        previous.iat[-1, -1] += "\n" + "\n".join(chunk.leading)
+                        self.stats.continuation_lines += len(chunk.leading)
+                    else:
+                        self.stats.rejected_lines += len(chunk.leading)
+                        if reject_out:
+                            reject_out.writelines(line + "\n" for line in chunk.leading)
+                if reject_out:
+                    reject_out.writelines(line + "\n" for line in chunk.rejected)
+
+                logdf = chunk.df
+                if logdf.empty:
+                    continue
+                logdf.index = pd.RangeIndex(start, start + len(logdf))
+                start += len(logdf)
+                if previous is not None:
+                    yield previous
+                previous = logdf
+        finally:
+            if reject_out:
+                reject_out.close()
+
+        if self.stats.rejected_lines:
+            logging.warning(
+                "{} of {} lines in {} do not match the log format".format(
+                    self.stats.rejected_lines, self.stats.total_lines, fpath
+                )
+            )
+        if previous is not None:
+            yield previous
+        else:
+            yield pd.DataFrame(
+                [], columns=headers, dtype=get_string_dtype(self.config.string_dtype) or str
+            )
+
+    def _parse_line_chunks(self, fpath, headers, regex, maxsplit):
+        chunk_size = self.config.chunk_size
+        with _open_log_lines(fpath, self.config) as fin:
+            if not chunk_size:
+                yield _parse_log_lines(fin, headers, regex, maxsplit, self.config)
+                return
+            while True:
+                lines = list(itertools.islice(fin, chunk_size))
+                if not lines:
+                    return
+                yield _parse_log_lines(lines, headers, regex, maxsplit, self.config)
 
-        log_messages = []
-        cnt = 0
-        with open(fpath, "r") as fin:
-            lines = fin.readlines()
-            for line in lines:
-                cnt += 1
-                try:
-                    match = regex.search(line.strip())
-                    message = [match.group(header) for header in headers]
-                    #print(message)
-                    log_messages.append(message)
-                except Exception as e:
-                    logging.error("Read log file failed. Exception {}.".format(e))
-
-        logdf = pd.DataFrame(log_messages, columns=headers, dtype=str)
-        #print(logdf.columns)
-        return logdf
+    def _parse_byte_ranges(self, fpath, headers, regex, maxsplit):
+        """
+        Parses newline-aligned byte ranges of the file in a process pool, yielding the parsed
+        chunks in file order.
+        """
+        ranges = _split_byte_ranges(fpath, self.config.range_size)
+        parse = partial(
+            _parse_byte_range,
+            fpath=fpath,
+            config=self.config,
+            headers=headers,
+            regex=regex,
+            maxsplit=maxsplit,
+        )
+        with multiprocessing.Pool(processes=self.config.num_workers) as pool:
+            yield from pool.imap(parse, ranges)
 
     def _create_log_record_object(self, df: pd.DataFrame):
         dims = self.config.dimensions
@@ -103,11 +278,7 @@ class FileDataLoader:
         # Read all available log fields from config.
 
         if not dims:
-            selected = pd.DataFrame(
-                df.agg(lambda x: " ".join(x.values), axis=1).rename(
-                    constants.LOGLINE_NAME
-                )
-            )
+            selected = pd.DataFrame(join_columns(df, constants.LOGLINE_NAME))
             setattr(log_record, "body", selected)
         else:
             for field in LogRecordObject.__dataclass_fields__:
@@ -116,9 +287,7 @@ class FileDataLoader:
                     if field == "body":
                         if len(selected.columns) > 1:
                             selected = pd.DataFrame(
-                                selected.agg(
-                                    lambda x: " ".join(x.values), axis=1
-                                ).rename(constants.LOGLINE_NAME)
+                                join_columns(selected, constants.LOGLINE_NAME)
                             )
                         else:
                             selected.columns = [constants.LOGLINE_NAME]
@@ -133,20 +302,99 @@ class FileDataLoader:
                     if field == "timestamp":
                         if len(selected.columns) > 1:
                             selected = pd.DataFrame(
-                                selected.agg(
-                                    lambda x: " ".join(x.values), axis=1
-                                ).rename(constants.LOG_TIMESTAMPS)
+                                join_columns(selected, constants.LOG_TIMESTAMPS)
                             )
                         selected.columns = [constants.LOG_TIMESTAMPS]
-                        if self.config.infer_datetime and self.config.datetime_format:
-                            datetime_format = self.config.datetime_format
-                            print("datetime format", datetime_format)
-                            print("sel", selected[constants.LOG_TIMESTAMPS])
-                            selected[constants.LOG_TIMESTAMPS] = pd.to_datetime(
-                                selected[constants.LOG_TIMESTAMPS],
-                                format=datetime_format,
-                            )
+                        selected = self.timestamp_parser.parse(
+                            selected[constants.LOG_TIMESTAMPS]
+                        )
 
                     setattr(log_record, field, selected)
         # log_record.__post_init__()
+        if self.config.encode_body:
+            log_record.encode_body()
         return log_record
+
+
+def _parse_log_lines(lines, headers, regex, maxsplit, config) -> _ParsedChunk:
+    """
+    Tokenizes log lines into a dataframe of log format fields. Lines that do not match the log
+    format are counted, kept for the reject file or merged into the previous record, as configured.
+    """
+    log_messages = []
+    stats = LoadStats()
+    rejected = []
+    leading = []
+    for line in lines:
+        stats.total_lines += 1
+        message = None
+        if maxsplit is not None:
+            message = line.strip().split(None, maxsplit)
+            # Lines with fewer tokens may still match the regex with empty fields.
+            if len(message) != len(headers):
+                message = None
+        if message is None:
+            match = regex.search(line.strip())
+            if match is not None:
+                message = [match.group(header) for header in headers]
+
+        if message is not None:
+            stats.parsed_lines += 1
+            log_messages.append(message)
+        elif config.merge_continuation:
+            if log_messages:
+                log_messages[-1][-1] += "\n" + line.rstrip()
+                stats.continuation_lines += 1
+            else:
+                leading.append(line.rstrip())
+        else:
+            stats.rejected_lines += 1
+            if config.reject_file:
+                rejected.append(line.rstrip("\r\n"))
+
+    df = pd.DataFrame(
+        log_messages, columns=headers, dtype=get_string_dtype(config.string_dtype) or str
+    )
+    return _ParsedChunk(df, stats, rejected, leading)
+
+
+def _split_byte_ranges(fpath, range_size):
+    """
+    Splits a file into (start, end) byte ranges of about `range_size` bytes, each ending right
+    after a newline.
+    """
+    size = os.path.getsize(fpath)
+    bounds = [0]
+    with open(fpath, "rb") as fin:
+        while bounds[-1] + range_size < size:
+            fin.seek(bounds[-1] + range_size - 1)
+            fin.readline()
+            if fin.tell() >= size:
+                break
+            bounds.append(fin.tell())
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _parse_byte_range(byte_range, fpath, config, headers, regex, maxsplit) -> _ParsedChunk:
+    start, end = byte_range
+    with _open_log_lines(fpath, config, start, end) as lines:
+        return _parse_log_lines(lines, headers, regex, maxsplit, config)
+
+
+@contextlib.contextmanager
+def _open_log_lines(fpath, config, start=0, end=None):
+    """
+    Opens an iterator over the decoded lines of a file, or of the byte range [start, end) of it.
+    Lines are split with universal newlines, as when reading the file in text mode.
+    """
+    if start == 0 and end is None:
+        with open(fpath, "r", encoding=config.encoding, errors=config.encoding_errors) as fin:
+            yield fin
+    else:
+        with open(fpath, "rb") as fin:
+            fin.seek(start)
+            data = fin.read(end - start)
+        yield io.TextIOWrapper(
+            io.BytesIO(data), encoding=config.encoding, errors=config.encoding_errors
+        )
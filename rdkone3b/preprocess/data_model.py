@@ -11,8 +11,46 @@ from dataclasses import dataclass, field
 import pathlib
 import json
 from rdkone3b.utils import constants
+from rdkone3b.utils.cache_util import _extension_dtypes, _table_to_dataframe
 import logging
 
+# Schema metadata key holding the mapping of columns to LogRecordObject fields
+ARROW_METADATA_KEY = b"rdkone3b.meta_data"
+# The string, Arrow-backed and categorical dtypes of the saved columns, which Arrow does not restore.
+ARROW_DTYPES_KEY = b"rdkone3b.dtypes"
+
+
+def get_string_dtype(name: str = None):
+    """
+    Resolves the dtype used to store log strings.
+
+    :param name: None or "object" for Python string objects, "pyarrow" for `pd.ArrowDtype(pa.string())`,
+        or the name of a pandas string dtype such as "string[pyarrow]".
+    :return: The string dtype, None for Python string objects.
+    """
+    if name is None or name == "object":
+        return None
+    if name == "pyarrow":
+        import pyarrow as pa
+
+        return pd.ArrowDtype(pa.string())
+    return pd.api.types.pandas_dtype(name)
+
+
+def join_columns(data: pd.DataFrame, name: str = None) -> pd.Series:
+    """
+    Joins the string columns of a dataframe row-wise, separated by a single space, with vectorized
+    string concatenation instead of a Python call per row.
+
+    :param data: The dataframe whose columns are joined.
+    :param name: The name of the resulting series.
+    :return: The joined strings.
+    """
+    columns = [data.iloc[:, i] for i in range(data.shape[1])]
+    if len(columns) == 1:
+        return columns[0].rename(name)
+    return columns[0].str.cat(columns[1:], sep=" ").rename(name)
+
 
 @dataclass
 class LogRecordObject:
@@ -49,9 +87,11 @@ class LogRecordObject:
         self._index = pd.DataFrame(self.body.index.values)
 
         for field in self.__dataclass_fields__:
+            if field == "_index":
+                continue
             field_content = getattr(self, field)
             if not field_content.empty:
-                if not field_content.index.equals(self._index.index):
+                if not field_content.index.equals(self.body.index):
                     raise IndexError(
                         "Index of {} should match Index of this object".format(field)
                     )
@@ -67,15 +107,28 @@ class LogRecordObject:
                 meta_data_dict[field] = columns
         return meta_data_dict
 
-    def to_dataframe(self):
+    def to_dataframe(self, columns: list = None):
         """
         Generates pandas.DataFrame from LogRecordType.
+
+        :param columns: The columns to project, in order. By default all columns of all fields are joined.
         """
         if self.body.empty:
             return None
+        if columns is not None:
+            # Fields share the body index, so the projected columns are concatenated without joins.
+            frames = []
+            for field in self.__dataclass_fields__:
+                field_content = getattr(self, field)
+                if field == "_index" or field_content.empty:
+                    continue
+                selected = [c for c in field_content.columns if c in columns]
+                if selected:
+                    frames.append(field_content[selected])
+            return pd.concat(frames, axis=1)[list(columns)]
         df = self.body
         for field in self.__dataclass_fields__:
-            if field == "body":
+            if field in ("body", "_index"):
                 continue
             field_content = getattr(self, field)
             if not field_content.empty:
@@ -93,7 +146,7 @@ class LogRecordObject:
         :return: A LogRecordObject object.
         """
         if meta_data is None and not data.empty:
-            logbody = data.apply(" ".join, axis=1)
+            logbody = pd.DataFrame(join_columns(data, constants.LOGLINE_NAME))
             return LogRecordObject(body=logbody)
 
         logrecord = LogRecordObject()
@@ -131,52 +184,299 @@ class LogRecordObject:
         meta_data = json.load(open(filepath_metadata))
         return cls.from_dataframe(data=data, meta_data=meta_data)
 
-    def select_by_index(self, indices: list, inplace: bool = False):
+    def save(self, filepath: str):
+        """
+        Saves a log record object to a Parquet (.parquet) or Arrow IPC (.arrow, .feather) file. Dtypes
+        and index are kept, and the mapping of columns to fields is stored in the schema metadata.
+
+        :param filepath: The absolute path to filename where the logrecord object would be saved.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        data = self.to_dataframe()
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        metadata = dict(table.schema.metadata or {})
+        metadata[ARROW_METADATA_KEY] = json.dumps(self._meta_data()).encode("utf8")
+        metadata[ARROW_DTYPES_KEY] = json.dumps(_extension_dtypes(data)).encode("utf8")
+        table = table.replace_schema_metadata(metadata)
+
+        suffix = pathlib.Path(filepath).suffix
+        if suffix == ".parquet":
+            pq.write_table(table, filepath)
+        elif suffix in (".arrow", ".feather"):
+            # Uncompressed buffers can be memory-mapped without copies.
+            with pa.OSFile(filepath, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        else:
+            raise Exception("Only supports parquet, arrow and feather formats")
+
+    @classmethod
+    def load(cls, filepath: str, memory_map: bool = True, lazy: bool = False):
+        """
+        Loads a log record object saved by `save`.
+
+        :param filepath: The absolute path to the Parquet or Arrow IPC file.
+        :param memory_map: Whether the file is memory-mapped. Arrow-backed columns of Arrow IPC files are
+            then read without copies. The dtypes of the saved columns are restored either way.
+        :param lazy: Whether to return a LazyLogRecordObject, which reads a field only when it is accessed.
+        :return: The loaded log record object.
+        """
+        if lazy:
+            return LazyLogRecordObject(filepath, memory_map=memory_map)
+        table = read_arrow_table(filepath, memory_map)
+        meta_data = json.loads(table.schema.metadata[ARROW_METADATA_KEY])
+        columns = [c for field_columns in meta_data.values() for c in field_columns]
+        data = _table_to_pandas(table, columns, memory_map)
+        return cls.from_dataframe(data=data, meta_data=meta_data)
+
+    def encode_body(self):
+        """Dictionary-encodes the body loglines into a categorical column, holding integer codes plus
+        the unique loglines. Repeated loglines are then stored once, and select_by_index,
+        filter_by_index, dropna and to_dataframe keep working on the encoded column.
+
+        :return: The log record object with encoded body.
+        """
+        if not self.body.empty and not isinstance(
+            self.body[constants.LOGLINE_NAME].dtype, pd.CategoricalDtype
+        ):
+            self.body = self.body.astype({constants.LOGLINE_NAME: "category"})
+        return self
+
+    def decode_body(self):
+        """Decodes dictionary-encoded body loglines back to a plain string column.
+
+        :return: The log record object with decoded body.
+        """
+        if not self.body.empty:
+            logline = self.body[constants.LOGLINE_NAME]
+            if isinstance(logline.dtype, pd.CategoricalDtype):
+                self.body = self.body.astype(
+                    {constants.LOGLINE_NAME: logline.cat.categories.dtype}
+                )
+        return self
+
+    def unique_loglines(self):
+        """Returns the body loglines as integer codes into the unique loglines, reusing the dictionary
+        of an encoded body.
+
+        :return: A tuple of the codes, -1 for null loglines, and the unique loglines.
+        """
+        logline = self.body[constants.LOGLINE_NAME]
+        if isinstance(logline.dtype, pd.CategoricalDtype):
+            return logline.cat.codes.values, logline.cat.categories
+        return pd.factorize(logline)
+
+    def select_by_index(self, indices: list, inplace: bool = False, view: bool = False):
         """Selects a subset of a logrecord object based on selected indices.
         
         :param indices: A list of indices to select inplace (bool, optional): performs operation inplace or not.
+        :param view: Whether to return a lazy view, which copies a field only when it is read.
         :return: LogRecordObject: The resulting logr ecord object created from the selected indices.
         """
-        if not inplace:
-            target = LogRecordObject()
-        else:
-            target = self
-        for key in self.__dataclass_fields__.keys():
-            val = getattr(self, key)
-            if type(val) == pd.DataFrame and not val.empty:
-                val = val[val.index.isin(indices)]
-            target.__setattr__(key, val)
-        return target
+        return self.take(self._positions_of(indices), inplace=inplace, view=view)
 
-    def filter_by_index(self, indices: list, inplace: bool = False):
+    def filter_by_index(self, indices: list, inplace: bool = False, view: bool = False):
         """Selects a subset of a logrecord object by removing certain indices.
         
         :param indices: A list of indices to remove inplace (bool, optional): performs operation inplace or not.
+        :param view: Whether to return a lazy view, which copies a field only when it is read.
         :return: The resulting log record object created after removing the indices.
         """
-        if not inplace:
-            target = LogRecordObject()
-        else:
-            target = self
+        mask = ~self._row_index().isin(indices)
+        return self.take(np.flatnonzero(mask), inplace=inplace, view=view)
+
+    def take(self, positions: np.ndarray, inplace: bool = False, view: bool = False):
+        """Selects a subset of a logrecord object by row positions. The positions are computed once and
+        applied to every field sharing the row index, so the cost is proportional to the selected rows.
+
+        :param positions: The sorted row positions to select.
+        :param inplace: Whether to perform the operation inplace.
+        :param view: Whether to return a lazy view, which copies a field only when it is read.
+        :return: The resulting log record object.
+        """
+        if view and not inplace:
+            return LogRecordView(self, positions)
+        target = self if inplace else LogRecordObject()
+        index = self._row_index()
         for key in self.__dataclass_fields__.keys():
-            val = getattr(self, key)
-            if type(val) == pd.DataFrame and not val.empty:
-                val = val[~val.index.isin(indices)]
-            target.__setattr__(key, val)
+            if key == "_index":
+                continue
+            target.__setattr__(key, _take_rows(getattr(self, key), positions, index))
+        target._index = pd.DataFrame(target.body.index.values)
         return target
 
+    def _row_index(self) -> pd.Index:
+        """Returns the row index shared by the fields, which is the body index unless the body is empty."""
+        for key in self.__dataclass_fields__.keys():
+            val = getattr(self, key)
+            if key != "_index" and type(val) == pd.DataFrame and not val.empty:
+                return val.index
+        return self.body.index
+
+    def _positions_of(self, indices: list) -> np.ndarray:
+        """Returns the sorted row positions of the given index labels, ignoring missing labels."""
+        index = self._row_index()
+        if not index.is_unique:
+            return np.flatnonzero(index.isin(indices))
+        positions = index.get_indexer(pd.Index(indices).unique())
+        positions = positions[positions >= 0]
+        positions.sort()
+        return positions
+
     def dropna(self):
         """Method to drop entries containing NaN or null values in the logrecord object.
         
         :return: The modified logrecord object after removing entries with NaN or null values.
         """
-        null_body = self.body.isnull()
-        null_body = null_body[null_body[constants.LOGLINE_NAME] == True]
-        null_indices = list(null_body.index)
-        if len(null_indices) > 0:
+        null_body = self.body[constants.LOGLINE_NAME].isnull().values
+        num_null = int(null_body.sum())
+        if num_null > 0:
             logging.info(
-                "Removed {} indices with null value ".format(len(null_indices))
+                "Removed {} indices with null value ".format(num_null)
             )
-            return self.filter_by_index(null_indices, inplace=True)
+            return self.take(np.flatnonzero(~null_body), inplace=True)
         else:
             return self
+
+
+class LogRecordView(LogRecordObject):
+    """
+    Lazy subset of a log record object. It holds the source object and the selected row positions, and
+    copies the rows of a field only when the field is first read.
+
+    :param source: The log record object to select rows from.
+    :param positions: The sorted row positions to select.
+    """
+
+    def __init__(self, source: LogRecordObject, positions: np.ndarray):
+        self._source = source
+        self._positions = positions
+
+    def __getattr__(self, name):
+        # Only called for fields which have not been materialized yet.
+        if name not in LogRecordObject.__dataclass_fields__:
+            raise AttributeError(name)
+        if name == "_index":
+            value = pd.DataFrame(self.body.index.values)
+        else:
+            source = self.__dict__["_source"]
+            value = _take_rows(
+                getattr(source, name), self.__dict__["_positions"], source._row_index()
+            )
+        setattr(self, name, value)
+        return value
+
+
+class LazyLogRecordObject(LogRecordObject):
+    """
+    Log record object backed by a file saved with `LogRecordObject.save`. Parquet columns stay on disk and
+    Arrow IPC files are memory-mapped; a field is converted to a DataFrame only when it is first accessed,
+    and `to_dataframe` reads just the projected columns.
+
+    :param filepath: The path to the Parquet or Arrow IPC file.
+    :param memory_map: Whether the file is memory-mapped.
+    """
+
+    def __init__(self, filepath: str, memory_map: bool = True):
+        import pyarrow.parquet as pq
+
+        if pathlib.Path(filepath).suffix == ".parquet":
+            self._source = pq.ParquetFile(filepath, memory_map=memory_map)
+            schema = self._source.schema_arrow
+        else:
+            self._source = read_arrow_table(filepath, memory_map)
+            schema = self._source.schema
+        self._fields = json.loads(schema.metadata[ARROW_METADATA_KEY])
+        self._index_columns = [
+            c for c in schema.pandas_metadata["index_columns"] if isinstance(c, str)
+        ]
+        self._memory_map = memory_map
+
+    def __getattr__(self, name):
+        # Only called for fields which have not been materialized yet.
+        if name not in LogRecordObject.__dataclass_fields__:
+            raise AttributeError(name)
+        if name == "_index":
+            value = pd.DataFrame(self.body.index.values)
+        elif name in self.__dict__["_fields"]:
+            value = self._read_columns(self.__dict__["_fields"][name])
+        else:
+            value = pd.DataFrame()
+        setattr(self, name, value)
+        return value
+
+    def to_dataframe(self, columns: list = None):
+        """
+        Generates pandas.DataFrame from the stored columns, reading only the requested ones.
+
+        :param columns: The columns to project, in order. By default all columns of all fields are read.
+        """
+        if "body" not in self._fields:
+            return None
+        if columns is None:
+            fields = ["body"] + [f for f in self.__dataclass_fields__ if f != "body"]
+            columns = [c for f in fields for c in self._fields.get(f, [])]
+        return self._read_columns(columns)
+
+    def _read_columns(self, columns: list) -> pd.DataFrame:
+        import pyarrow as pa
+
+        columns = list(columns)
+        if isinstance(self._source, pa.Table):
+            table = self._source.select(columns + self._index_columns)
+        else:
+            table = self._source.read(columns=columns, use_pandas_metadata=True)
+        return _table_to_pandas(table, columns, self._memory_map)
+
+
+def _take_rows(val, positions: np.ndarray, index: pd.Index):
+    """Selects rows of a field by positions in the shared row index."""
+    if type(val) != pd.DataFrame or val.empty:
+        return val
+    if val.index is index or val.index.equals(index):
+        return val.take(positions)
+    return val[val.index.isin(index.take(positions))]
+
+
+def read_arrow_table(filepath: str, memory_map: bool = True):
+    """
+    Reads a Parquet (.parquet) or Arrow IPC (.arrow, .feather) file into an Arrow table.
+
+    :param filepath: The path to the file.
+    :param memory_map: Whether the file is memory-mapped, which makes Arrow IPC reads zero-copy.
+    :return: The pyarrow.Table.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    suffix = pathlib.Path(filepath).suffix
+    if suffix == ".parquet":
+        return pq.read_table(filepath, memory_map=memory_map)
+    elif suffix in (".arrow", ".feather"):
+        source = pa.memory_map(filepath, "r") if memory_map else pa.OSFile(filepath, "rb")
+        return pa.ipc.open_file(source).read_all()
+    else:
+        raise Exception("Only supports parquet, arrow and feather formats")
+
+
+def _table_to_pandas(table, columns: list, memory_map: bool) -> pd.DataFrame:
+    """Converts the columns of a table saved by `LogRecordObject.save` to a DataFrame with their saved
+    dtypes. Files saved without dtypes get Arrow-backed strings when memory-mapped."""
+    metadata = table.schema.metadata or {}
+    if ARROW_DTYPES_KEY not in metadata:
+        types_mapper = _arrow_string_types_mapper if memory_map else None
+        return table.to_pandas(types_mapper=types_mapper)[columns]
+    dtypes = json.loads(metadata[ARROW_DTYPES_KEY])
+    return _table_to_dataframe(
+        table, columns, {name: dtype for name, dtype in dtypes.items() if name in columns}
+    )
+
+
+def _arrow_string_types_mapper(arrow_type):
+    import pyarrow as pa
+
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
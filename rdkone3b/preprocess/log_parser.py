@@ -1,8 +1,10 @@
 from drain3 import TemplateMiner
+from drain3.file_persistence import FilePersistence
 from drain3.template_miner_config import TemplateMinerConfig
 
 import os
 
+import dataclasses
 import logging
 import json
 import pandas as pd
@@ -12,9 +14,22 @@ from rdkone3b.applications.config_loader import ConfigIndex, ConfigLoader
 
 from rdkone3b.utils.constants import UPLOAD_DIRECTORY
 from rdkone3b.utils import constants
-from rdkone3b.preprocess.data_loader import FileDataLoader, DataLoaderConfig
+from rdkone3b.utils.cache_util import ParquetCache, config_hash, file_hash
+from rdkone3b.preprocess.data_loader import FileDataLoader, DataLoaderConfig, LoadStats
 from rdkone3b.preprocess.preprocessor import Preprocessor, PreprocessorConfig
-from rdkone3b.preprocess.data_model import LogRecordObject
+from rdkone3b.preprocess.parameter_extractor import ParameterExtractor
+from rdkone3b.preprocess.template_matcher import TemplateMatcher
+from rdkone3b.preprocess.parsing_index import (
+    AttributeIndex,
+    ParameterStore,
+    TemplateIndex,
+    TrendCube,
+    to_categorical,
+)
+from rdkone3b.preprocess.data_model import (
+    LogRecordObject,
+    get_string_dtype,
+)
 
 """
 config = TemplateMinerConfig()
@@ -33,8 +48,100 @@ for line in log_lines:
     parsed_logs.append(result["template_mined"])
 """
 
+class CheckpointTemplateMiner(TemplateMiner):
+    """
+    TemplateMiner saving its state every `checkpoint_interval` mined loglines, together with the
+    progress of the file being mined: its key and the number of its loglines accounted for in the
+    state. TemplateMiner itself saves the whole tree whenever a cluster is created or changed, which
+    is quadratic on a cold start, and records no progress to resume from.
+
+    :param persistence_handler: The persistence handler the state is loaded from and saved to.
+    :param config: The TemplateMiner config.
+    :param checkpoint_interval: The number of loglines between checkpoints, 0 disables them.
+    :param progress_path: The JSON file the progress is loaded from and saved to, None to not record it.
+    """
+    def __init__(self, persistence_handler, config, checkpoint_interval: int = 0, progress_path=None):
+        super().__init__(persistence_handler=persistence_handler, config=config)
+        self.checkpoint_interval = checkpoint_interval
+        self.progress_path = progress_path
+        self.progress = {}
+        if progress_path is not None and os.path.exists(progress_path):
+            with open(progress_path) as f:
+                self.progress = json.load(f)
+
+    def get_snapshot_reason(self, change_type, cluster_id):
+        # States are saved by `mined`, once the counts of the loglines are complete.
+        return None
+
+    def resume(self, key: dict) -> int:
+        """
+        Starts recording the progress of a file.
+
+        :param key: The JSON serializable key of the file and of how its loglines are mined.
+        :return: The number of its loglines already accounted for in the state, 0 for another file.
+        """
+        lines = self.progress.get("lines", 0) if self.progress.get("key") == key else 0
+        self.progress = {"key": key, "lines": lines}
+        return lines
+
+    def mined(self, n_lines: int):
+        """Records that the first `n_lines` loglines of the file are accounted for in the state, and
+        saves it every `checkpoint_interval` loglines."""
+        self.progress["lines"] = max(self.progress.get("lines", 0), n_lines)
+        if self.checkpoint_interval and n_lines % self.checkpoint_interval == 0:
+            self.save_state("checkpoint after {} loglines".format(n_lines))
+
+    def save_state(self, snapshot_reason):
+        super().save_state(snapshot_reason)
+        if self.progress_path is not None and self.progress:
+            # The progress is written after the state, so that it never counts loglines the state lacks.
+            tmp_path = self.progress_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.progress, f)
+            os.replace(tmp_path, self.progress_path)
+
+
 class LogParser():
-    def __init__(self):
+    """
+    Parses log files into log patterns with Drain.
+
+    :param deduplicate: Whether to preprocess and mine only the unique loglines, weighted by their
+        counts, and broadcast the templates and parameters back to all rows. Each logline then gets the
+        final template of its cluster rather than the template at the time it was mined.
+    :param state_dir: The directory the Drain state of each log type (the name of its ConfigIndex entry)
+        and cleaning and Drain settings is persisted to. Parsing a file then starts from the templates
+        learned from earlier files of the same type. The progress of the last file mined is persisted
+        with the state, and parsing that file again only looks up the templates of its loglines already
+        accounted for, without counting them again. None mines every file from scratch.
+    :param checkpoint_interval: The number of loglines between saves of the Drain state while parsing,
+        so that an interrupted parse resumes after the last checkpoint. 0 saves it only at the end.
+    :param cache_dir: The directory the parsing results are cached in, keyed by the content of the file,
+        the configs of its log type and the Drain settings. The loaded log record and the preprocessed
+        loglines are cached too, so that changing a config re-runs only its stage and the stages after
+        it. None disables the cache.
+    :param cache_size: The maximum size in bytes of the cache, least recently used results are evicted.
+    :param match_only: Whether to classify the loglines into the templates already learned for the log
+        type with a TemplateMatcher, and mine only the loglines matching none of them. The templates
+        are then not refined by loglines they match. Requires `state_dir`, the first file of a log type
+        is mined as usual.
+    """
+    def __init__(
+        self,
+        deduplicate: bool = False,
+        state_dir: str = None,
+        checkpoint_interval: int = 100000,
+        cache_dir: str = None,
+        cache_size: int = 1024 ** 3,
+        match_only: bool = False,
+    ):
+        self.deduplicate = deduplicate
+        self.state_dir = state_dir
+        self.checkpoint_interval = checkpoint_interval
+        self.cache = None if cache_dir is None else ParquetCache(cache_dir, cache_size)
+        self.match_only = match_only
+        self.log_type = None
+        self.miner = None
+        self._resume_lines = 0
         self.drain_config = TemplateMinerConfig()
         #self.drain_config.load(config_filename=None)
 
@@ -44,8 +151,13 @@ class LogParser():
         self.config = None
 
         self._parsing_results = pd.DataFrame()
+        self._template_index = None
+        self._trend_cube = None
+        self._attribute_index = None
+        self._parameter_store = None
         self._attributes = None
         self._timestamp = None
+        self._load_stats = None
 
     @property
     def parsing_results(self):
@@ -55,42 +167,94 @@ class LogParser():
     def attributes(self):
         return self._attributes
 
+    @property
+    def load_stats(self):
+        return self._load_stats
+
+    @property
+    def template_index(self):
+        """The TemplateIndex from the templates of the parsing results to their rows."""
+        return self._template_index
+
+    @property
+    def trend_cube(self):
+        """The TrendCube of the template counts per time bucket, None without timestamps."""
+        return self._trend_cube
+
     @property
     def log_patterns(self):
         if self._parsing_results.empty:
             return None
-        return self._parsing_results[constants.PARSED_LOGLINE_NAME].unique()
+        return self._template_index.templates.to_numpy()
+
+    def template_positions(self, log_pattern) -> np.ndarray:
+        """
+        Returns the positions of the rows of a log pattern in the parsing results.
+
+        :param log_pattern: The log pattern.
+        :return: The row positions in increasing order, empty if the log pattern is unknown.
+        """
+        if self._template_index is None:
+            return np.array([], dtype=np.int64)
+        return self._template_index.rows(log_pattern)
     
     @property
     def result_table(self):
         return self.parsing_results
     
-    def get_dynamic_parameter_list(self, log_pattern):
+    def get_trend(self, log_pattern, freq: str) -> pd.DataFrame:
+        """
+        Returns the number of loglines of a log pattern per time bucket.
+
+        :param log_pattern: The log pattern.
+        :param freq: The bucket frequency, one of "1s", "1min", "1h" and "1d".
+        :return: A dataframe of the buckets from the first to the last occurrence of the log pattern,
+            labelled by their right edge, and their counts.
+        """
+        if self._trend_cube is not None:
+            template_id = self._template_index.template_id(log_pattern)
+            if template_id >= 0:
+                return self._trend_cube.trend(template_id, freq)
+        return pd.DataFrame(
+            {
+                constants.LOG_TIMESTAMPS: pd.Series([], dtype="datetime64[ns]"),
+                "count": pd.Series([], dtype=np.int64),
+            }
+        )
+
+    def get_stacked_trends(self, freq: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Returns the number of loglines of all log patterns per time bucket, for a stacked trend chart.
+
+        :param freq: The bucket frequency, one of "1s", "1min", "1h" and "1d".
+        :param start: The first bucket label included, None from the first bucket.
+        :param end: The last bucket label included, None up to the last bucket.
+        :return: A dataframe in long form of the non-empty buckets labelled by their right edge, the log
+            patterns and their counts. None without timestamps.
+        """
+        if self._trend_cube is None:
+            return None
+        return self._trend_cube.stacked(freq, self._template_index.templates, start, end)
+
+    def get_dynamic_parameter_list(self, log_pattern, max_values: int = None):
         """
         For a given log pattern, return the dynamic parameters.
         
         :param log_pattern: The input log pattern.
-        :return: The parameter list with Values, valuecounts and position.
+        :param max_values: The maximum number of distinct values listed per position, None for all.
+        :return: The parameter list with the position, the number of values, the number of distinct
+            values and the distinct values by decreasing number of occurrences of each position.
         """
-        para_list = pd.DataFrame(None, columns=["position", "value_counts", "values"])
+        para_list = pd.DataFrame(
+            None, columns=["position", "value_counts", "distinct_counts", "values"]
+        )
         if self._parsing_results.empty or not log_pattern:
             return para_list
 
-        res = self._parsing_results
-        parameters = res.loc[res[constants.PARSED_LOGLINE_NAME] == log_pattern][
-            constants.PARAMETER_LIST_NAME
-        ]
-
-        para_list["values"] = pd.Series(
-            pd.DataFrame(parameters.tolist()).T.values.tolist()
-        )
-        para_list["position"] = [
-            "POSITION_{}".format(v) for v in para_list.index.values
-        ]
-        para_list["value_counts"] = [
-            len(list(filter(None, v))) for v in para_list["values"]
-        ]
-        return para_list
+        template_id = self._template_index.template_id(log_pattern)
+        if template_id < 0:
+            return para_list
+        return self._parameter_store.summary(template_id, max_values)
 
     def recognize_parameter_entity(self, para_list):
         """
@@ -111,21 +275,21 @@ class LogParser():
         log_pattern = None
         para_list = None
         if not self._parsing_results.empty:
-            res = self._parsing_results.loc[
-                self._parsing_results[constants.LOGLINE_NAME] == logline
-            ]
-            log_patterns = res[constants.PARSED_LOGLINE_NAME]
-            if len(log_patterns) == 0:
+            rows = np.flatnonzero(
+                (self._parsing_results[constants.LOGLINE_NAME] == logline).to_numpy(
+                    dtype=bool, na_value=False
+                )
+            )
+            if len(rows) == 0:
                 return None
-            if len(log_patterns) == 1:
-                log_pattern_index = log_patterns.index[0]
-                log_pattern = log_patterns.iloc[log_pattern_index]
-            else:
-                logging.warning("multiple log pa†terns are found!")
-                log_pattern_index = log_patterns.index[0]
-                log_pattern = log_patterns.iloc[log_pattern_index]
+            template_ids = np.unique(
+                self._parsing_results[constants.PARSED_LOGLINE_NAME].cat.codes.to_numpy()[rows]
+            )
+            if len(template_ids) > 1:
+                logging.warning("multiple log patterns are found!")
+            log_pattern = self._parsing_results[constants.PARSED_LOGLINE_NAME].iloc[rows[0]]
             if return_para_list:
-                para_list = self.get_parameter_list(log_pattern)
+                para_list = self.get_dynamic_parameter_list(log_pattern)
 
         return log_pattern, para_list
     
@@ -136,21 +300,25 @@ class LogParser():
         :return: pd.Series of loglines
         """
         df = self.result_table
-        res = df[df["parsed_logline"] == log_pattern].drop(
-            ["parameter_list", "parsed_logline"], axis=1
+        res = df.iloc[self.template_positions(log_pattern)].drop(
+            ["parameter_list", "parsed_logline", constants.LOG_TIMESTAMPS_NS],
+            axis=1,
+            errors="ignore",
         )
 
         return res
     
     def summary_graph_df(self, attributes=[]):
-        parsed_df = self.result_table
-
-        if len(attributes) > 0:
-            for attr in attributes:
-                for k, v in attr.items():
-                    parsed_df = parsed_df[parsed_df[k] == v]
-
-        count_table = parsed_df["parsed_logline"].value_counts()
+        codes = self.result_table[constants.PARSED_LOGLINE_NAME].cat.codes.to_numpy()
+
+        filters = [(k, v) for attr in attributes for k, v in attr.items()]
+        if len(filters) > 0:
+            codes = codes[self._select_rows(filters)]
+        count_table = pd.Series(
+            np.bincount(codes[codes >= 0], minlength=len(self._template_index)),
+            index=self._template_index.templates,
+        )
+        count_table = count_table[count_table > 0].sort_values(ascending=False, kind="stable")
 
         scatter_df = pd.DataFrame(count_table)
 
@@ -161,6 +329,19 @@ class LogParser():
 
         return scatter_df
         
+    def _select_rows(self, filters: list) -> np.ndarray:
+        """Returns the positions of the rows of the parsing results whose column k equals v for all
+        (k, v) filters, using the attribute index for the attribute columns."""
+        index = self._attribute_index
+        if index is None:
+            index = AttributeIndex(len(self.result_table), {}, {})
+        rows = index.select([(k, v) for k, v in filters if k in index])
+        for k, v in filters:
+            if k not in index:
+                column = self.result_table[k].iloc[rows]
+                rows = rows[(column == v).to_numpy(dtype=bool, na_value=False)]
+        return rows
+
     def _load_config(self, filename):
 
         root_dir = os.path.dirname(os.path.abspath(__file__))
@@ -170,7 +351,11 @@ class LogParser():
             print(f"Loading config from {config_list_path}")
             self.config_index = ConfigIndex.load_from_file(config_list_path)
             if self.config_index:
-                self.config_path = self.config_index.find_config_for_file(filename)
+                entry = self.config_index.find_entry_for_file(filename)
+                self.log_type = entry.name
+                self.config_path = os.path.join(
+                    root_dir, "../configs", entry.supported_config
+                )
                 if os.path.exists(self.config_path):
                     try:
                          with open(self.config_path, 'r') as f:
@@ -191,13 +376,12 @@ class LogParser():
 
     def _load_data(self, filename):
         if self.config is not None and self.config.data_loader_config is not None:
-            data_loader_config = self.config.data_loader_config = DataLoaderConfig.from_dict(
-                            self.config.data_loader_config
-                        )
+            data_loader_config = self.config.data_loader_config
             fpath = os.path.join(self.merged_logs_path, filename)
             if os.path.exists(fpath):
-                data_loader = FileDataLoader(self.path, data_loader_config)
+                data_loader = FileDataLoader(fpath, data_loader_config)
                 log_record_object = data_loader.load_data()
+                self._load_stats = data_loader.stats
                 return log_record_object
     
     def _preprocess(self, logrecord: LogRecordObject):
@@ -209,14 +393,77 @@ class LogParser():
 
         return preprocessed_loglines
     
+    @property
+    def state_path(self):
+        """The file the Drain state of the current log type is persisted to, None without persistence.
+        The name holds a hash of the cleaning patterns and the Drain settings, so that templates mined
+        with other settings are not mixed in."""
+        if self.state_dir is None or self.log_type is None:
+            return None
+        preprocessor_config = getattr(self.config, "preprocessor_config", None) or PreprocessorConfig()
+        settings = config_hash(
+            preprocessor_config.custom_delimiters_regex,
+            preprocessor_config.custom_replace_list,
+            self.drain_config,
+        )
+        return os.path.join(self.state_dir, "{}-{}.bin".format(self.log_type, settings[:16]))
+
+    def _create_miner(self, cold_start: bool = False):
+        state_path = self.state_path
+        if state_path is None:
+            return TemplateMiner(config=self.drain_config)
+        os.makedirs(self.state_dir, exist_ok=True)
+        progress_path = os.path.splitext(state_path)[0] + ".progress.json"
+        if cold_start:
+            for path in (state_path, progress_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        return CheckpointTemplateMiner(
+            FilePersistence(state_path), self.drain_config, self.checkpoint_interval, progress_path
+        )
+
+    def _resume(self, filename, cache_keys=None) -> int:
+        """Starts recording the mining progress of a file in the Drain state.
+
+        :param filename: The name of the file in the merged logs directory.
+        :param cache_keys: The stage keys of the file if already computed.
+        :return: The number of loglines of the file already accounted for in the state.
+        """
+        if not isinstance(self.miner, CheckpointTemplateMiner):
+            return 0
+        keys = cache_keys or self._stage_keys(filename)
+        if keys is None:
+            return 0
+        return self.miner.resume(
+            {
+                "file": keys["file"],
+                "preprocess": keys["preprocess"],
+                "deduplicate": self.deduplicate,
+                "match_only": self.match_only,
+            }
+        )
+
+    def _mined(self, n_lines: int):
+        if isinstance(self.miner, CheckpointTemplateMiner):
+            self.miner.mined(n_lines)
+
+    def _resumed_cluster(self, line):
+        """Returns the cluster of a logline accounted for in the state, None if none matches it."""
+        return self.miner.match(line, full_search_strategy="fallback")
+
     def _parse(self, log_lines: pd.Series):
         """Parse log lines using TemplateMiner."""
-        self.miner = TemplateMiner(config=self.drain_config)
         parsed_results = []
 
-        for line in log_lines:
+        for i, line in enumerate(log_lines):
+            if i < self._resume_lines:
+                cluster = self._resumed_cluster(line)
+                if cluster is not None:
+                    parsed_results.append(cluster.get_template())
+                    continue
             result = self.miner.add_log_message(line)
             parsed_results.append(result["template_mined"])
+            self._mined(i + 1)
 
         _parsing_results = pd.Series(parsed_results, index=log_lines.index)
 
@@ -225,7 +472,9 @@ class LogParser():
     @staticmethod
     def get_parameter_list(row):
         """
-        Returns parameter list of the loglines.
+        Returns parameter list of the loglines, as the tokens of the logline that do not occur in its
+        template. parse_logs extracts the parameters at the wildcard positions of the templates with
+        ParameterExtractor instead.
 
         :param row: The row in dataframe as function input containing ['logline', 'parsed_logline'].
         :return: The list of dynamic parameters.
@@ -241,28 +490,166 @@ class LogParser():
             parameter_list.append(t)
         return parameter_list
     
-    def parse_logs(self, filename: str):
-        
-        """ Load configuration for specific logs"""
-        self._load_config(filename)
-        
-        """ Load and preprocess log data """
-        log_record_object = self._load_data(filename)
-        if log_record_object is not None:
-            """ extract loglines and attributes from LogRecordObject """
-            preprocessed_loglines = self._preprocess(log_record_object)
-        
-        """ DRAIN3 input loglines"""
-        parsed_loglines = self._parse(preprocessed_loglines.dropna())
+    def _parse_all(self, preprocessed_loglines: pd.Series) -> pd.DataFrame:
+        if self.match_only:
+            parsed_loglines = self._match(preprocessed_loglines.dropna())
+        else:
+            parsed_loglines = self._parse(preprocessed_loglines.dropna())
 
         if preprocessed_loglines.name is not constants.LOGLINE_NAME:
             preprocessed_loglines.name = constants.LOGLINE_NAME
         parsed_loglines.name = constants.PARSED_LOGLINE_NAME
         parsed_results = pd.concat([preprocessed_loglines, parsed_loglines], axis=1)
 
-        parsed_results[constants.PARAMETER_LIST_NAME] = parsed_results.apply(
-            self.get_parameter_list, axis=1
+        parsed_results[constants.PARAMETER_LIST_NAME] = _to_parameter_array(
+            ParameterExtractor(self.miner).extract(
+                parsed_results[constants.LOGLINE_NAME],
+                parsed_results[constants.PARSED_LOGLINE_NAME],
+            )
+        )
+        return parsed_results
+
+    def _parse_unique(self, logrecord: LogRecordObject) -> pd.DataFrame:
+        """Preprocesses and mines the unique loglines only, in order of first occurrence.
+
+        :param logrecord: The log record object.
+        :return: The parsed loglines and parameter lists of all rows.
+        """
+        codes, uniques = logrecord.unique_loglines()
+        codes = np.asarray(codes, dtype=np.int64)
+        valid = codes >= 0
+        # Categorical codes are in category order and may skip unused categories.
+        order = pd.unique(codes[valid])
+        counts = np.bincount(codes[valid], minlength=len(uniques))[order]
+
+        preprocessor = Preprocessor(self.config.preprocessor_config)
+        cleaned, _ = preprocessor.clean_log(
+            pd.Series(uniques, name=constants.LOGLINE_NAME).take(order).reset_index(drop=True)
+        )
+        # Distinct loglines may be equal once cleaned.
+        cleaned_codes, cleaned_uniques = pd.factorize(cleaned)
+        cleaned_counts = np.bincount(cleaned_codes, weights=counts, minlength=len(cleaned_uniques))
+
+        templates = self._mine_unique(list(cleaned_uniques), cleaned_counts.astype(np.int64))
+
+        unique_results = pd.DataFrame(
+            {
+                constants.LOGLINE_NAME: cleaned_uniques,
+                constants.PARSED_LOGLINE_NAME: templates,
+            }
+        )
+        parameter_lists = ParameterExtractor(self.miner).extract(cleaned_uniques, templates)
+
+        # Rows map to the cleaned unique loglines, and null loglines to a trailing empty result.
+        row_ids = np.full(len(uniques), -1, dtype=np.int64)
+        row_ids[order] = cleaned_codes
+        row_ids = np.where(valid, row_ids[codes], len(unique_results))
+        parsed_loglines = np.append(
+            unique_results[constants.PARSED_LOGLINE_NAME].to_numpy(dtype=object), np.nan
         )
+        return pd.DataFrame(
+            {
+                constants.PARSED_LOGLINE_NAME: parsed_loglines[row_ids],
+                constants.PARAMETER_LIST_NAME: _to_parameter_array(parameter_lists + [[]], row_ids),
+            },
+            index=logrecord.body.index,
+        )
+
+    def _match(self, log_lines: pd.Series) -> pd.Series:
+        """Parses log lines by their distinct values, each getting the final template of its cluster."""
+        codes, uniques = pd.factorize(log_lines)
+        templates = self._mine_unique(list(uniques), np.bincount(codes, minlength=len(uniques)))
+        return pd.Series(np.asarray(templates, dtype=object)[codes], index=log_lines.index)
+
+    def _mine_unique(self, lines: list, counts: np.ndarray) -> list:
+        """Mines distinct loglines weighted by their counts. A repeated logline matches the cluster of
+        its first occurrence without changing its template, so it is accounted for by adding its count
+        to the cluster size instead. In match-only mode, the loglines matching a known template are
+        classified first and the others are mined after them.
+
+        :param lines: The distinct loglines, in order of first occurrence.
+        :param counts: The number of occurrences of each logline.
+        :return: The final template of the cluster of each logline.
+        """
+        cluster_ids = np.full(len(lines), -1, dtype=np.int64)
+        templates = [None] * len(lines)
+        if self.match_only and self.miner.drain.clusters:
+            cluster_ids = TemplateMatcher(self.miner).match(lines)
+
+        # Loglines are accounted for in order, so that a checkpoint covers the loglines before it.
+        for i in range(len(lines)):
+            if i < self._resume_lines:
+                cluster = (
+                    self._resumed_cluster(lines[i])
+                    if cluster_ids[i] < 0
+                    else self.miner.drain.id_to_cluster.get(int(cluster_ids[i]))
+                )
+                if cluster is not None:
+                    cluster_ids[i] = cluster.cluster_id
+                    continue
+            if cluster_ids[i] >= 0:
+                cluster = self.miner.drain.id_to_cluster.get(int(cluster_ids[i]))
+                cluster.size += int(counts[i])
+            else:
+                result = self.miner.add_log_message(lines[i])
+                cluster = self.miner.drain.id_to_cluster.get(result["cluster_id"])
+                if cluster is not None:
+                    cluster.size += int(counts[i]) - 1
+                cluster_ids[i] = result["cluster_id"]
+                templates[i] = result["template_mined"]
+            self._mined(i + 1)
+        for i, cluster_id in enumerate(cluster_ids.tolist()):
+            cluster = self.miner.drain.id_to_cluster.get(cluster_id)
+            if cluster is not None:
+                templates[i] = cluster.get_template()
+        return templates
+
+    def parse_logs(self, filename: str, cold_start: bool = False):
+        """
+        Parses a log file.
+
+        :param filename: The name of the file in the merged logs directory.
+        :param cold_start: Whether to discard the persisted Drain state of the log type and learn the
+            templates from scratch, instead of using cached results.
+        """
+
+        """ Load configuration for specific logs"""
+        self._load_config(filename)
+
+        """ Reuse the results of an identical file parsed with the same configs """
+        cache_keys = self._cache_keys(filename)
+        if cache_keys is not None and not cold_start and self._load_cached_results(
+            cache_keys["parse"]
+        ):
+            return
+
+        """ Load and preprocess log data, reusing the stages whose input and config are unchanged """
+        log_record_object = self._cached_load_data(filename, cache_keys)
+        if log_record_object is not None:
+            """ extract loglines and attributes from LogRecordObject """
+            if not self.deduplicate:
+                preprocessed_loglines = self._cached_preprocess(log_record_object, cache_keys)
+            self._attributes = (
+                None if log_record_object.attributes.empty else log_record_object.attributes
+            )
+            self._timestamp = (
+                None if log_record_object.timestamp.empty else log_record_object.timestamp
+            )
+        
+        """ DRAIN3 input loglines"""
+        self.miner = self._create_miner(cold_start)
+        self._resume_lines = self._resume(filename, cache_keys)
+        if self.deduplicate:
+            parsed_results = self._parse_unique(log_record_object)
+        else:
+            parsed_results = self._parse_all(preprocessed_loglines)
+        if self.miner.persistence_handler is not None:
+            self.miner.save_state("end of {}".format(filename))
+        string_dtype = self.config.data_loader_config.string_dtype
+        if get_string_dtype(string_dtype) is not None:
+            parsed_results = parsed_results.astype(
+                {constants.PARSED_LOGLINE_NAME: get_string_dtype(string_dtype)}
+            )
         self._parsing_results = parsed_results[
             [constants.PARSED_LOGLINE_NAME, constants.PARAMETER_LIST_NAME]
         ]
@@ -275,10 +662,154 @@ class LogParser():
         if self._timestamp is not None:
             self._parsing_results = self._parsing_results.join(self._timestamp)
 
+        self._build_indexes()
+        if cache_keys is not None:
+            self._cache_results(cache_keys["parse"])
         return
 
+    def _build_indexes(self):
+        results = self._parsing_results
+        results[constants.PARSED_LOGLINE_NAME] = to_categorical(
+            results[constants.PARSED_LOGLINE_NAME]
+        )
+        self._template_index = TemplateIndex.from_categorical(results[constants.PARSED_LOGLINE_NAME])
+        self._attribute_index = (
+            None
+            if self._attributes is None
+            else AttributeIndex.from_dataframe(results[self._attributes.columns])
+        )
+        self._parameter_store = ParameterStore.from_lists(
+            results[constants.PARAMETER_LIST_NAME],
+            results[constants.PARSED_LOGLINE_NAME].cat.codes,
+            len(self._template_index),
+        )
+
+        self._trend_cube = None
+        if constants.LOG_TIMESTAMPS_NS in results:
+            timestamps_ns = results[constants.LOG_TIMESTAMPS_NS].to_numpy(dtype=np.int64)
+        elif constants.LOG_TIMESTAMPS in results and pd.api.types.is_datetime64_dtype(
+            results[constants.LOG_TIMESTAMPS]
+        ):
+            timestamps_ns = (
+                results[constants.LOG_TIMESTAMPS].to_numpy(dtype="datetime64[ns]").view(np.int64)
+            )
+        else:
+            return
+        self._trend_cube = TrendCube.from_timestamps(
+            results[constants.PARSED_LOGLINE_NAME].cat.codes,
+            timestamps_ns,
+            len(self._template_index),
+        )
+
+    def _cache_keys(self, filename):
+        """Returns the cache keys of the load, preprocess and parse stages. Each key is derived from the
+        key of the previous stage and the config of the stage, so a config change misses the cache of
+        its stage and of the stages after it."""
+        if self.cache is None:
+            return None
+        return self._stage_keys(filename)
+
+    def _stage_keys(self, filename):
+        """Returns the hash of a file and the keys of its load, preprocess and parse stages, None if the
+        file or the configs are missing."""
+        if self.config is None:
+            return None
+        fpath = os.path.join(self.merged_logs_path, filename)
+        if not os.path.exists(fpath):
+            return None
+        content_hash = file_hash(fpath)
+        load_key = config_hash("load", content_hash, self.config.data_loader_config)
+        preprocess_key = config_hash("preprocess", load_key, self.config.preprocessor_config)
+        parse_key = config_hash(
+            "parse", preprocess_key, self.drain_config, self.deduplicate, self.match_only
+        )
+        return {
+            "file": content_hash,
+            "load": load_key,
+            "preprocess": preprocess_key,
+            "parse": parse_key,
+        }
+
+    def _cached_load_data(self, filename, cache_keys):
+        cached = None if cache_keys is None else self.cache.get(cache_keys["load"])
+        if cached is not None:
+            data, metadata = cached
+            self._load_stats = LoadStats(**metadata["load_stats"])
+            return LogRecordObject.from_dataframe(data, metadata["fields"])
+
+        log_record_object = self._load_data(filename)
+        if cache_keys is not None and log_record_object is not None:
+            data = log_record_object.to_dataframe()
+            if data is not None:
+                metadata = {
+                    "fields": log_record_object._meta_data(),
+                    "load_stats": dataclasses.asdict(self._load_stats),
+                }
+                self.cache.put(cache_keys["load"], data, metadata)
+        return log_record_object
+
+    def _cached_preprocess(self, logrecord: LogRecordObject, cache_keys):
+        cached = None if cache_keys is None else self.cache.get(cache_keys["preprocess"])
+        if cached is not None:
+            return cached[0][constants.LOGLINE_NAME]
+
+        preprocessed_loglines = self._preprocess(logrecord)
+        if cache_keys is not None:
+            self.cache.put(
+                cache_keys["preprocess"], preprocessed_loglines.to_frame(constants.LOGLINE_NAME)
+            )
+        return preprocessed_loglines
+
+    def _cache_results(self, cache_key):
+        metadata = {
+            "attributes": [] if self._attributes is None else list(self._attributes.columns),
+            "timestamp": [] if self._timestamp is None else list(self._timestamp.columns),
+            "load_stats": None if self._load_stats is None else dataclasses.asdict(self._load_stats),
+        }
+        self.cache.put(cache_key, self._parsing_results, metadata)
+
+    def _load_cached_results(self, cache_key):
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return False
+        self._parsing_results, metadata = cached
+        self._attributes = (
+            self._parsing_results[metadata["attributes"]] if metadata["attributes"] else None
+        )
+        self._timestamp = (
+            self._parsing_results[metadata["timestamp"]] if metadata["timestamp"] else None
+        )
+        self._load_stats = (
+            None if metadata["load_stats"] is None else LoadStats(**metadata["load_stats"])
+        )
+        self._build_indexes()
+        # The persisted Drain state, if any, already holds the templates of the cached results.
+        # Without it the miner starts empty.
+        self.miner = self._create_miner()
+        return True
+
     def get_attributes(self):
         return self._attributes
 
     def get_templates(self):
-        return self.miner.get_templates()
\ No newline at end of file
+        """Returns the templates of the parsing results, also when they were read from the cache."""
+        if self._template_index is None:
+            return []
+        return self._template_index.templates.tolist()
+
+
+def _to_parameter_array(parameter_lists: list, rows=None) -> pd.api.extensions.ExtensionArray:
+    """
+    Converts parameter lists to an Arrow list of strings array, so that the parsing results hold no
+    Python list per row.
+
+    :param parameter_lists: The parameter lists.
+    :param rows: The positions of the parameter list of each row, None for one row per list.
+    :return: The parameter list of each row.
+    """
+    import pyarrow as pa
+
+    lists = pa.array(parameter_lists, type=pa.list_(pa.string()))
+    if rows is not None:
+        lists = lists.take(pa.array(rows))
+    return pd.arrays.ArrowExtensionArray(lists)
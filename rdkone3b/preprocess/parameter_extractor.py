@@ -0,0 +1,96 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+import re
+
+import numpy as np
+import pandas as pd
+
+
+class ParameterExtractor:
+    """
+    Extracts the dynamic parameters of loglines from their Drain templates, with the same values as
+    `TemplateMiner.get_parameter_list`. The loglines of a template are split into tokens together and
+    the tokens at the wildcard positions of the template are taken as parameters. Loglines that do not
+    line up with their template token by token, and templates with masks inside tokens, are left to
+    the regex matching of drain3.
+
+    :param miner: The TemplateMiner the templates were mined with.
+    """
+
+    def __init__(self, miner):
+        self.miner = miner
+        config = miner.config
+        self.extra_delimiters = [re.compile(d) for d in config.drain_extra_delimiters]
+        mask_names = set(miner.masker.mask_names) | {"*"}
+        self.wildcards = {config.mask_prefix + name + config.mask_suffix for name in mask_names}
+
+    def extract(self, loglines, templates) -> list:
+        """
+        Extracts the parameters of loglines.
+
+        :param loglines: The loglines.
+        :param templates: The template of each logline, null for loglines that were not parsed.
+        :return: The parameter list of each logline, empty if the logline does not match its template.
+        """
+        lines = pd.Series(loglines).to_numpy(dtype=object, na_value=None)
+        codes, uniques = pd.factorize(pd.Series(templates).to_numpy(dtype=object, na_value=None))
+        result = [[] if code < 0 else None for code in codes.tolist()]
+
+        order = np.argsort(codes, kind="stable")
+        offsets = np.cumsum(np.bincount(codes + 1, minlength=len(uniques) + 1))
+        for i, template in enumerate(uniques):
+            positions = order[offsets[i] : offsets[i + 1]].tolist()
+            values = self._extract_template(str(template), lines[positions].tolist())
+            for position, value in zip(positions, values):
+                result[position] = value
+        return result
+
+    def _extract_template(self, template: str, lines: list) -> list:
+        tokens = template.split()
+        params = [j for j, t in enumerate(tokens) if t in self.wildcards]
+        if any(w in t for t in tokens for w in self.wildcards if t not in self.wildcards):
+            # A mask inside a token may cover any part of it.
+            return [self._fallback(template, line) for line in lines]
+        if not params:
+            # The parameter list of a template without wildcards is empty, whether it matches or not.
+            return [[] for _ in lines]
+
+        messages = lines
+        for delimiter in self.extra_delimiters:
+            messages = [delimiter.sub(" ", m) if isinstance(m, str) else m for m in messages]
+        split = [m.split() if isinstance(m, str) else None for m in messages]
+        # drain3 matches the whitespace at the ends of a logline as part of the parameters next to it.
+        aligned = np.fromiter(
+            (
+                s is not None and len(s) == len(tokens) and not (m[:1].isspace() or m[-1:].isspace())
+                for m, s in zip(messages, split)
+            ),
+            dtype=bool,
+            count=len(lines),
+        )
+        rows = np.flatnonzero(aligned)
+        if len(rows) == 0:
+            return [self._fallback(template, line) for line in lines]
+        values = np.empty((len(rows), len(tokens)), dtype=object)
+        values[:] = [split[r] for r in rows]
+        matched = np.ones(len(rows), dtype=bool)
+        for j, t in enumerate(tokens):
+            if j not in params:
+                matched &= values[:, j] == t
+
+        result = [None] * len(lines)
+        for r, v in zip(rows[matched], values[matched][:, params].tolist()):
+            result[r] = v
+        for r in np.flatnonzero(~aligned).tolist() + rows[~matched].tolist():
+            result[r] = self._fallback(template, lines[r])
+        return result
+
+    def _fallback(self, template: str, line) -> list:
+        if not isinstance(line, str):
+            return []
+        return self.miner.get_parameter_list(template, line)
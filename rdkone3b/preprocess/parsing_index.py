@@ -0,0 +1,444 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+from rdkone3b.preprocess.preprocessor import NAT_NS
+from rdkone3b.utils import constants
+
+
+def to_categorical(parsed_loglines: pd.Series) -> pd.Series:
+    """
+    Converts parsed loglines to a categorical column whose categories are the templates in order of
+    first occurrence, so that the codes of the column are the template ids.
+
+    :param parsed_loglines: The template of each logline, null for loglines that were not parsed.
+    :return: The categorical templates, with the dtype of the templates kept in the categories.
+    """
+    if isinstance(parsed_loglines.dtype, pd.CategoricalDtype):
+        return parsed_loglines
+    codes, templates = pd.factorize(parsed_loglines)
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=templates),
+        index=parsed_loglines.index,
+        name=parsed_loglines.name,
+    )
+
+
+@dataclass
+class TemplateIndex:
+    """
+    Inverted index from the templates of the parsing results to their rows. The template with id i is
+    `templates[i]` and its rows are `positions[offsets[i]:offsets[i + 1]]`, in increasing order.
+
+    :param templates: The templates, i.e., the categories of the parsed logline column.
+    :param offsets: The start of each template in positions, followed by the number of parsed rows.
+    :param positions: The row positions sorted by template id.
+    """
+    templates: pd.Index
+    offsets: np.ndarray
+    positions: np.ndarray
+
+    @classmethod
+    def from_categorical(cls, parsed_loglines: pd.Series):
+        """
+        Builds the index of a categorical parsed logline column.
+
+        :param parsed_loglines: The categorical templates of the parsing results.
+        :return: The TemplateIndex.
+        """
+        codes = parsed_loglines.cat.codes.to_numpy(dtype=np.int64)
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes + 1, minlength=len(parsed_loglines.cat.categories) + 1)
+        # Rows without a template have code -1 and come first.
+        offsets = np.cumsum(counts)
+        return cls(
+            templates=parsed_loglines.cat.categories,
+            offsets=offsets - counts[0],
+            positions=order[counts[0] :],
+        )
+
+    def __len__(self):
+        return len(self.templates)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """The number of rows of each template."""
+        return np.diff(self.offsets)
+
+    def template_id(self, template) -> int:
+        """Returns the id of a template, -1 if it is not in the index."""
+        try:
+            return int(self.templates.get_loc(template))
+        except (KeyError, TypeError):
+            return -1
+
+    def rows(self, template) -> np.ndarray:
+        """Returns the row positions of a template, empty if it is not in the index."""
+        i = self.template_id(template)
+        if i < 0:
+            return np.array([], dtype=self.positions.dtype)
+        return self.positions[self.offsets[i] : self.offsets[i + 1]]
+
+
+# The trend frequencies and their bucket lengths in seconds, each a multiple of the one before.
+TREND_FREQUENCIES = {"1s": 1, "1min": 60, "1h": 3600, "1d": 86400}
+
+_NS_PER_SECOND = 10 ** 9
+
+
+@dataclass
+class TrendLevel:
+    """
+    Counts of the templates per time bucket at one frequency, as a sparse template by bucket matrix in
+    CSR form. The template with id i occurs `counts[offsets[i]:offsets[i + 1]]` times in the buckets
+    `buckets[offsets[i]:offsets[i + 1]]`, where bucket b spans `[b * seconds, (b + 1) * seconds)`
+    seconds since the epoch.
+
+    :param seconds: The length of the buckets in seconds.
+    :param offsets: The start of each template in buckets and counts, followed by their length.
+    :param buckets: The non-empty buckets of each template in increasing order.
+    :param counts: The number of rows of each template in each bucket.
+    """
+    seconds: int
+    offsets: np.ndarray
+    buckets: np.ndarray
+    counts: np.ndarray
+
+    @classmethod
+    def from_sorted(cls, seconds: int, template_ids, buckets, counts, n_templates: int):
+        """Sums the counts of equal (template id, bucket) pairs, which are sorted by template id and
+        then by bucket."""
+        if len(buckets):
+            change = np.flatnonzero(
+                np.concatenate(
+                    ([True], (template_ids[1:] != template_ids[:-1]) | (buckets[1:] != buckets[:-1]))
+                )
+            )
+            template_ids, buckets, counts = (
+                template_ids[change],
+                buckets[change],
+                np.add.reduceat(counts, change),
+            )
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(template_ids, minlength=n_templates))))
+        return cls(seconds, offsets, buckets, counts)
+
+    def roll_up(self, seconds: int):
+        """Returns the level with buckets of `seconds`, a multiple of the buckets of this level."""
+        template_ids = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        return TrendLevel.from_sorted(
+            seconds,
+            template_ids,
+            self.buckets // (seconds // self.seconds),
+            self.counts,
+            len(self.offsets) - 1,
+        )
+
+    def timestamps(self, buckets) -> np.ndarray:
+        """Returns the right edges of buckets, which label them in the trends."""
+        return ((buckets + 1) * self.seconds * _NS_PER_SECOND).view("datetime64[ns]")
+
+
+@dataclass
+class TrendCube:
+    """
+    Counts of the templates of the parsing results per time bucket, at each of the TREND_FREQUENCIES.
+    The counts are computed per second and rolled up to the coarser frequencies. The trends give the
+    same counts as grouping the rows of a template by `pd.Grouper(freq=freq, label="right")`.
+
+    :param levels: The TrendLevel of each frequency.
+    """
+    levels: dict
+
+    @classmethod
+    def from_timestamps(cls, template_ids, timestamps_ns, n_templates: int):
+        """
+        Builds the cube of the rows of the parsing results.
+
+        :param template_ids: The template id of each row, -1 for rows without a template.
+        :param timestamps_ns: The int64 epoch nanoseconds of each row, NAT_NS for missing timestamps.
+        :param n_templates: The number of templates.
+        :return: The TrendCube.
+        """
+        template_ids = np.asarray(template_ids, dtype=np.int64)
+        timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+        valid = (template_ids >= 0) & (timestamps_ns != NAT_NS)
+        template_ids = template_ids[valid]
+        seconds = timestamps_ns[valid] // _NS_PER_SECOND
+        order = np.lexsort((seconds, template_ids))
+
+        levels = {}
+        level = None
+        for freq, length in TREND_FREQUENCIES.items():
+            if level is None:
+                level = TrendLevel.from_sorted(
+                    length,
+                    template_ids[order],
+                    seconds[order],
+                    np.ones(len(order), dtype=np.int64),
+                    n_templates,
+                )
+            else:
+                level = level.roll_up(length)
+            levels[freq] = level
+        return cls(levels)
+
+    def trend(self, template_id: int, freq: str) -> pd.DataFrame:
+        """
+        Returns the number of rows of a template per time bucket, from its first to its last bucket.
+
+        :param template_id: The template id.
+        :param freq: One of the TREND_FREQUENCIES.
+        :return: A dataframe of the buckets, labelled by their right edge, and their counts.
+        """
+        level = self.levels[freq]
+        start, end = level.offsets[template_id], level.offsets[template_id + 1]
+        buckets = level.buckets[start:end]
+        if len(buckets) == 0:
+            buckets = np.array([], dtype=np.int64)
+            counts = np.array([], dtype=np.int64)
+        else:
+            counts = np.zeros(buckets[-1] - buckets[0] + 1, dtype=np.int64)
+            counts[buckets - buckets[0]] = level.counts[start:end]
+            buckets = np.arange(buckets[0], buckets[-1] + 1)
+        return pd.DataFrame({constants.LOG_TIMESTAMPS: level.timestamps(buckets), "count": counts})
+
+    def stacked(self, freq: str, templates: pd.Index, start=None, end=None) -> pd.DataFrame:
+        """
+        Returns the number of rows of all templates per time bucket, for stacked trend charts. The
+        counts are in long form, one row per template and non-empty bucket, so their size is that of
+        the cube rather than the number of buckets times the number of templates.
+
+        :param freq: One of the TREND_FREQUENCIES.
+        :param templates: The templates, in order of template id.
+        :param start: The first bucket label included, None from the first bucket.
+        :param end: The last bucket label included, None up to the last bucket.
+        :return: A dataframe of the buckets, labelled by their right edge, the templates and their
+            counts, ordered by bucket and template id.
+        """
+        level = self.levels[freq]
+        template_ids = np.repeat(np.arange(len(templates)), np.diff(level.offsets))
+        buckets, counts = level.buckets, level.counts
+        labels = level.timestamps(buckets)
+        selected = np.ones(len(buckets), dtype=bool)
+        if start is not None:
+            selected &= labels >= pd.Timestamp(start).to_datetime64()
+        if end is not None:
+            selected &= labels <= pd.Timestamp(end).to_datetime64()
+        order = np.flatnonzero(selected)
+        order = order[np.argsort(buckets[order], kind="stable")]
+        return pd.DataFrame(
+            {
+                constants.LOG_TIMESTAMPS: labels[order],
+                "template": pd.Categorical.from_codes(template_ids[order], categories=templates),
+                "count": counts[order],
+            }
+        )
+
+
+@dataclass
+class AttributeIndex:
+    """
+    Bitmap index of the attribute values of the parsing results. The rows of a value are stored as a
+    bitmap packed with `np.packbits` if the value occurs in more than one row in 64, and as sorted row
+    positions otherwise, which then take less memory. Filters on several values are intersections of
+    their row sets.
+
+    :param n_rows: The number of rows.
+    :param values: The distinct non-null values of each attribute.
+    :param rows: The rows of each value of each attribute, as a uint8 bitmap or int64 row positions.
+    """
+    n_rows: int
+    values: dict
+    rows: dict
+
+    @classmethod
+    def from_dataframe(cls, attributes: pd.DataFrame):
+        """
+        Builds the index of attribute columns.
+
+        :param attributes: The attribute columns of the parsing results.
+        :return: The AttributeIndex.
+        """
+        n_rows = len(attributes)
+        values = {}
+        rows = {}
+        for name in attributes.columns:
+            codes, uniques = pd.factorize(attributes[name])
+            order = np.argsort(codes, kind="stable").astype(np.int64, copy=False)
+            counts = np.bincount(codes + 1, minlength=len(uniques) + 1)
+            offsets = np.cumsum(counts)
+            value_rows = []
+            for i in range(len(uniques)):
+                if counts[i + 1] * 64 > n_rows:
+                    value_rows.append(np.packbits(codes == i))
+                else:
+                    value_rows.append(order[offsets[i] : offsets[i + 1]])
+            values[name] = pd.Index(uniques)
+            rows[name] = value_rows
+        return cls(n_rows, values, rows)
+
+    def __contains__(self, name):
+        return name in self.values
+
+    def select(self, filters: list) -> np.ndarray:
+        """
+        Returns the rows matching all filters.
+
+        :param filters: The (attribute, value) pairs, which must all be in the index.
+        :return: The sorted positions of the matching rows.
+        """
+        row_sets = []
+        for name, value in filters:
+            try:
+                row_sets.append(self.rows[name][self.values[name].get_loc(value)])
+            except (KeyError, TypeError):
+                return np.array([], dtype=np.int64)
+        if not row_sets:
+            return np.arange(self.n_rows)
+
+        bitmaps = [s for s in row_sets if s.dtype == np.uint8]
+        position_sets = sorted((s for s in row_sets if s.dtype != np.uint8), key=len)
+        if not position_sets:
+            bitmap = bitmaps[0]
+            for other in bitmaps[1:]:
+                bitmap = bitmap & other
+            return np.flatnonzero(np.unpackbits(bitmap, count=self.n_rows))
+
+        positions = position_sets[0]
+        for other in position_sets[1:]:
+            positions = np.intersect1d(positions, other, assume_unique=True)
+        for bitmap in bitmaps:
+            positions = positions[(bitmap[positions >> 3] >> (7 - (positions & 7))) & 1 == 1]
+        return positions
+
+
+@dataclass
+class ParameterStore:
+    """
+    The parameter lists of the parsing results in columnar form, with a summary of each parameter
+    position of each template. The parameters of row r are `values[codes[offsets[r]:offsets[r + 1]]]`.
+    Template i has the parameter positions `positions[slots[i]:slots[i + 1]]`, and the values at slot s
+    are `values[top_codes[top_offsets[s]:top_offsets[s + 1]]]` by decreasing number of occurrences,
+    given by `top_counts`.
+
+    :param values: The distinct parameter values.
+    :param codes: The parameters of all rows, as positions in values, -1 for null parameters.
+    :param offsets: The start of each row in codes, followed by the number of parameters.
+    :param slots: The start of each template in the slots, followed by the number of slots.
+    :param positions: The parameter position of each slot.
+    :param value_counts: The number of non-null values of each slot.
+    :param top_offsets: The start of each slot in top_codes and top_counts.
+    :param top_codes: The distinct values of each slot, as positions in values.
+    :param top_counts: The number of occurrences of each distinct value of each slot.
+    """
+    values: pd.Index
+    codes: np.ndarray
+    offsets: np.ndarray
+    slots: np.ndarray
+    positions: np.ndarray
+    value_counts: np.ndarray
+    top_offsets: np.ndarray
+    top_codes: np.ndarray
+    top_counts: np.ndarray
+
+    @classmethod
+    def from_lists(cls, parameter_lists: pd.Series, template_ids, n_templates: int):
+        """
+        Builds the store of a parameter list column.
+
+        :param parameter_lists: The parameter list of each row, a column of lists or Arrow lists.
+        :param template_ids: The template id of each row, -1 for rows without a template.
+        :param n_templates: The number of templates.
+        :return: The ParameterStore.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if isinstance(parameter_lists.dtype, pd.ArrowDtype):
+            lists = pa.array(parameter_lists.array)
+        else:
+            lists = pa.array(
+                parameter_lists.to_numpy(dtype=object), type=pa.list_(pa.string()), from_pandas=True
+            )
+        if isinstance(lists, pa.ChunkedArray):
+            lists = lists.combine_chunks()
+        lengths = pc.fill_null(pc.list_value_length(lists), 0).to_numpy().astype(np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        encoded = pc.dictionary_encode(pc.list_flatten(lists))
+        codes = pc.fill_null(encoded.indices, -1).to_numpy().astype(np.int64)
+        values = pd.Index(encoded.dictionary.to_pandas())
+
+        # One entry per parameter: the template of its row, its position in the row and its value.
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        templates = np.asarray(template_ids, dtype=np.int64)[rows]
+        positions = np.arange(len(codes)) - offsets[rows]
+        keep = (templates >= 0) & (codes >= 0)
+        templates, positions, top_codes = templates[keep], positions[keep], codes[keep]
+
+        order = np.lexsort((top_codes, positions, templates))
+        templates, positions, top_codes = templates[order], positions[order], top_codes[order]
+        change = _run_starts(templates, positions, top_codes)
+        top_counts = np.diff(np.append(change, len(top_codes)))
+        templates, positions, top_codes = templates[change], positions[change], top_codes[change]
+
+        # The distinct values of each slot by decreasing count, ties by first value.
+        order = np.lexsort((top_codes, -top_counts, positions, templates))
+        templates, positions = templates[order], positions[order]
+        top_codes, top_counts = top_codes[order], top_counts[order]
+        slot_starts = _run_starts(templates, positions)
+        return cls(
+            values=values,
+            codes=codes,
+            offsets=offsets,
+            slots=np.concatenate(
+                ([0], np.cumsum(np.bincount(templates[slot_starts], minlength=n_templates)))
+            ),
+            positions=positions[slot_starts],
+            value_counts=np.add.reduceat(top_counts, slot_starts) if len(slot_starts) else top_counts,
+            top_offsets=np.append(slot_starts, len(top_codes)),
+            top_codes=top_codes,
+            top_counts=top_counts,
+        )
+
+    def summary(self, template_id: int, max_values: int = None) -> pd.DataFrame:
+        """
+        Returns the summary of the parameter positions of a template.
+
+        :param template_id: The template id.
+        :param max_values: The maximum number of distinct values listed per position, None for all.
+        :return: A dataframe with the position, the number of values, the number of distinct values and
+            the distinct values by decreasing number of occurrences of each parameter position.
+        """
+        slots = range(self.slots[template_id], self.slots[template_id + 1])
+        values = []
+        for s in slots:
+            start, end = self.top_offsets[s], self.top_offsets[s + 1]
+            if max_values is not None:
+                end = min(end, start + max_values)
+            values.append(self.values[self.top_codes[start:end]].tolist())
+        return pd.DataFrame(
+            {
+                "position": ["POSITION_{}".format(p) for p in self.positions[slots]],
+                "value_counts": self.value_counts[slots],
+                "distinct_counts": np.diff(self.top_offsets)[slots],
+                "values": pd.Series(values, dtype=object),
+            }
+        )
+
+
+def _run_starts(*keys) -> np.ndarray:
+    """Returns the positions where a run of equal keys starts, for keys sorted together."""
+    if len(keys[0]) == 0:
+        return np.array([], dtype=np.int64)
+    change = np.zeros(len(keys[0]), dtype=bool)
+    change[0] = True
+    for key in keys:
+        change[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(change)
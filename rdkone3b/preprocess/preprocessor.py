@@ -5,12 +5,19 @@
 # For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
 #
 #
+import logging
+import multiprocessing
+import re
 import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 
 from rdkone3b.utils.config_util import Config
 from rdkone3b.preprocess.data_model import LogRecordObject
+from rdkone3b.utils import constants
+
+# The int64 representation of NaT
+NAT_NS = np.iinfo(np.int64).min
 
 
 @dataclass
@@ -20,9 +27,15 @@ class PreprocessorConfig(Config):
     :param custom_delimiters_regex: A dictionary of delimiter regex patterns in raw log data.
     :param custom_replace_list: A list of tuples of custom replace patterns in raw log data.
         Each Tuple should be of form ('regex-pattern-to-replace', 'replaced-pattern').
+    :param num_workers: The number of processes cleaning chunks of the loglines in parallel,
+        1 cleans them in the current process.
+    :param chunk_size: The number of loglines per chunk cleaned by a worker, 0 splits the loglines
+        evenly among the workers.
     """
     custom_delimiters_regex: dict = None
     custom_replace_list: list = None
+    num_workers: int = 1
+    chunk_size: int = 0
 
 
 class Preprocessor:
@@ -32,58 +45,412 @@ class Preprocessor:
 
     def __init__(self, config: PreprocessorConfig):
         self.config = config
+        self._cleaning_plan = None
 
     def clean_log(self, loglines: pd.Series) -> pd.Series:
         """Cleans the input log data.
 
-        :param loglines: The raw loglines data to be cleaned .
+        :param loglines: The raw loglines data to be cleaned . Dictionary-encoded loglines are cleaned
+            once per unique logline.
         :return:pd.Series: The cleaned loglines data .
         """
-        cleaned_log = loglines
-        terms = pd.DataFrame()
-        if self.config.custom_delimiters_regex:
-            for reg in self.config.custom_delimiters_regex:
-                try:
-                    cleaned_log = cleaned_log.replace(
-                        to_replace=reg, value=" ", regex=True
+        if isinstance(loglines.dtype, pd.CategoricalDtype):
+            return self._clean_categorical_log(loglines)
+
+        if self._cleaning_plan is None:
+            self._cleaning_plan = CleaningPlan(self.config)
+        return self._cleaning_plan.apply(
+            loglines, num_workers=self.config.num_workers, chunk_size=self.config.chunk_size
+        )
+
+    def _clean_categorical_log(self, loglines: pd.Series):
+        codes = loglines.cat.codes.values
+        cleaned_categories, category_terms = self.clean_log(
+            pd.Series(loglines.cat.categories, name=loglines.name)
+        )
+        # Distinct loglines may be equal once cleaned, so the cleaned categories are re-encoded.
+        cleaned_log = pd.Series(
+            pd.Categorical(cleaned_categories).take(codes, allow_fill=True),
+            index=loglines.index,
+            name=loglines.name,
+        )
+        terms = category_terms.reindex(codes)
+        terms.index = loglines.index
+        return cleaned_log, terms
+
+    def group_log_index(self, attributes: pd.DataFrame, by: np.array) -> pd.DataFrame:
+        """Groups log attributes (DataFrame) by a list of its fields.
+
+        :param attributes: The log attribute data to be grouped.
+        :param by: A list of fields of the log attribute DataFrame object to group by.
+        :return: The log attribute data after grouping, with the array of indices of each group in
+            a "group_index" column.
+        """
+        groups = self.group_positions(attributes, by)
+        group_index_list = groups.keys.copy()
+        group_index_list["group_index"] = np.split(
+            attributes.index.values[groups.positions], groups.offsets[1:-1]
+        )
+        return group_index_list
+
+    def group_positions(self, attributes: pd.DataFrame, by: np.array, events=None):
+        """Groups log attributes by a list of its fields into compact arrays, without modifying
+        the attributes. Rows with a null key are left out, as in `DataFrame.groupby`.
+
+        :param attributes: The log attribute data to be grouped.
+        :param by: A list of fields of the log attribute DataFrame object to group by.
+        :param events: An optional array of the event (e.g. log pattern) of each row, counted per group.
+        :return: The LogGroups.
+        """
+        grouper = attributes.groupby(by=by, sort=True, observed=True)
+        group_ids = grouper.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+        keys = grouper.size().index.to_frame(index=False)
+        valid = group_ids >= 0
+
+        # A stable sort keeps the rows of each group in their original order.
+        positions = np.argsort(group_ids, kind="stable")[np.count_nonzero(~valid) :]
+        sizes = np.bincount(group_ids[valid], minlength=len(keys))
+        groups = LogGroups(
+            keys=keys,
+            offsets=np.concatenate([[0], np.cumsum(sizes)]),
+            positions=positions,
+        )
+        if events is not None:
+            event_codes, event_labels = pd.factorize(np.asarray(events))
+            valid &= event_codes >= 0
+            pairs, counts = np.unique(
+                group_ids[valid] * len(event_labels) + event_codes[valid], return_counts=True
+            )
+            groups.event_labels = pd.Index(event_labels)
+            groups.event_offsets = np.concatenate(
+                [[0], np.cumsum(np.bincount(pairs // len(event_labels), minlength=len(keys)))]
+            )
+            groups.event_ids = pairs % len(event_labels)
+            groups.event_counts = counts
+        return groups
+
+    def identify_timestamps(
+        self, logrecord: LogRecordObject, datetime_format: str = None
+    ) -> LogRecordObject:
+        """Parses the timestamp field of a log record object into a datetime column and an int64
+        epoch nanoseconds column.
+
+        :param logrecord: The log record object whose timestamp field holds timestamp strings.
+        :param datetime_format: The datetime format of the timestamps, detected from a sample if None.
+        :return: The log record object with parsed timestamps.
+        """
+        if logrecord.timestamp.empty:
+            return logrecord
+        parser = TimestampParser(datetime_format)
+        logrecord.timestamp = parser.parse(logrecord.timestamp[constants.LOG_TIMESTAMPS])
+        return logrecord
+
+
+@dataclass
+class LogGroups:
+    """
+    Groups of log rows in compressed form. The rows of group i are
+    `positions[offsets[i]:offsets[i + 1]]`, and if events were counted, group i has
+    `event_counts[event_offsets[i]:event_offsets[i + 1]]` occurrences of the events
+    `event_labels[event_ids[event_offsets[i]:event_offsets[i + 1]]]`.
+
+    :param keys: The key of each group, one column per grouping field.
+    :param offsets: The start of each group in positions, followed by the total number of rows.
+    :param positions: The row positions sorted by group.
+    :param event_labels: The distinct events.
+    :param event_offsets: The start of each group in event_ids and event_counts.
+    :param event_ids: The events occurring in each group, as positions in event_labels.
+    :param event_counts: The number of occurrences of each event in each group.
+    """
+    keys: pd.DataFrame
+    offsets: np.ndarray
+    positions: np.ndarray
+    event_labels: pd.Index = None
+    event_offsets: np.ndarray = None
+    event_ids: np.ndarray = None
+    event_counts: np.ndarray = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def group(self, i: int) -> np.ndarray:
+        """Returns the row positions of group i."""
+        return self.positions[self.offsets[i] : self.offsets[i + 1]]
+
+    def event_count_matrix(self) -> np.ndarray:
+        """Returns the event counts as a dense matrix of groups by events."""
+        matrix = np.zeros((len(self), len(self.event_labels)), dtype=np.int64)
+        rows = np.repeat(np.arange(len(self)), np.diff(self.event_offsets))
+        matrix[rows, self.event_ids] = self.event_counts
+        return matrix
+
+
+class TimestampParser:
+    """
+    Parses timestamp strings into datetimes. Logs repeat the same timestamp many times, so only the
+    unique values are parsed and the results are mapped back. Parsed values are cached across
+    calls, which lets a data loader parse a file chunk by chunk.
+
+    If no datetime format is given and none of the candidate formats parses the first timestamps,
+    the timestamps are kept as strings.
+
+    :param datetime_format: The datetime format of the timestamps. If None, the format is detected
+        from a sample of the first timestamps among `candidate_formats`.
+    :param candidate_formats: The formats tried when detecting the datetime format.
+    :param sample_size: The number of unique timestamps used to detect the datetime format.
+    :param cache_size: The maximum number of parsed timestamps cached, the cache is cleared when
+        it is full.
+    """
+
+    def __init__(
+        self,
+        datetime_format: str = None,
+        candidate_formats: list = None,
+        sample_size: int = 100,
+        cache_size: int = 100000,
+    ):
+        self.datetime_format = datetime_format
+        self.candidate_formats = candidate_formats or constants.DATETIME_FORMATS
+        self.sample_size = sample_size
+        self.cache_size = cache_size
+        self._detected = datetime_format is not None
+        self._cache = {}
+
+    def detect_format(self, timestamps: pd.Index) -> str:
+        """Detects the datetime format parsing most of a sample of the timestamps.
+
+        :param timestamps: The unique timestamp strings.
+        :return: The detected datetime format, None if no candidate format parses the sample.
+        """
+        sample = timestamps[: self.sample_size]
+        best_format, best_count = None, 0
+        for datetime_format in self.candidate_formats:
+            count = pd.to_datetime(
+                sample, format=datetime_format, errors="coerce", utc=True
+            ).notna().sum()
+            if count > best_count:
+                best_format, best_count = datetime_format, count
+            if best_count == len(sample):
+                break
+        return best_format
+
+    def parse(self, timestamps: pd.Series) -> pd.DataFrame:
+        """Parses timestamp strings.
+
+        :param timestamps: The timestamp strings.
+        :return: A dataframe with the same index, holding the parsed datetimes and the int64 epoch
+            nanoseconds, NaT for timestamps that cannot be parsed. Only the timestamp strings if the
+            datetime format could not be detected.
+        """
+        codes, uniques = pd.factorize(timestamps)
+        if not self._detected and len(uniques) > 0:
+            self.datetime_format = self.detect_format(uniques)
+            self._detected = True
+            if self.datetime_format is None:
+                logging.warning(
+                    "No datetime format parses timestamps such as {!r}, keeping them as strings.".format(
+                        uniques[0]
                     )
+                )
+        if self._detected and self.datetime_format is None:
+            return pd.DataFrame({constants.LOG_TIMESTAMPS: timestamps}, index=timestamps.index)
+
+        missing = [v for v in uniques if v not in self._cache]
+        if len(self._cache) + len(missing) > self.cache_size:
+            self._cache.clear()
+            missing = list(uniques)
+        if missing:
+            # Offsets, which may change within a log at daylight saving time, are converted to UTC.
+            # Timestamps without offset are taken as UTC, which keeps their wall clock time.
+            parsed = pd.to_datetime(
+                pd.Index(missing), format=self.datetime_format, errors="coerce", utc=True
+            )
+            self._cache.update(zip(missing, parsed.as_unit("ns").asi8))
+
+        unique_ns = np.fromiter(
+            (self._cache[v] for v in uniques), dtype=np.int64, count=len(uniques)
+        )
+        # Missing timestamps have code -1, which picks the trailing NaT.
+        ns = np.append(unique_ns, NAT_NS)[codes]
+        return pd.DataFrame(
+            {
+                constants.LOG_TIMESTAMPS: ns.view("datetime64[ns]"),
+                constants.LOG_TIMESTAMPS_NS: ns,
+            },
+            index=timestamps.index,
+        )
+
+
+class CleaningPlan:
+    """
+    The custom delimiter and replace patterns of a PreprocessorConfig, compiled once. Delimiters are
+    replaced by a space, then every replace pattern is substituted in order. The terms of a replace
+    pattern are recorded by the substitution itself as it replaces each match, so each pattern scans a
+    logline once instead of once for `str.findall` and once for `Series.replace`. The cleaned loglines
+    and terms are identical to applying those pattern by pattern.
+
+    :param config: The preprocessor config holding the patterns.
+    """
+
+    def __init__(self, config: PreprocessorConfig):
+        # Each step is (compiled pattern, replacement, collects terms, error message).
+        self.steps = []
+        if config.custom_delimiters_regex:
+            for reg in config.custom_delimiters_regex:
+                message = "Cannot replace custom regex delimiter {}".format(reg)
+                try:
+                    self.steps.append((re.compile(reg), " ", False, message))
                 except:
-                    raise RuntimeError(
-                        "Cannot replace custom regex delimiter {}".format(reg)
-                    )
+                    raise RuntimeError(message)
 
-        if self.config.custom_replace_list:
-            for pair in self.config.custom_replace_list:
-                # TODO: refactor to tuple or map.
+        self.has_terms = bool(config.custom_replace_list)
+        if config.custom_replace_list:
+            for pair in config.custom_replace_list:
                 try:
                     pattern = pair[0]
                     replacement = pair[1]
-                    terms[replacement] = cleaned_log.str.findall(pat=pattern)
-                    cleaned_log = cleaned_log.replace(
-                        to_replace=pattern, value=replacement, regex=True
+                    message = "Cannot replace custom regex: {} values: {}".format(
+                        pair[0], pair[1]
                     )
+                    self.steps.append((re.compile(pattern), replacement, True, message))
                 except:
                     raise RuntimeError(
                         "Cannot replace custom regex: {} values: {}".format(
                             pair[0], pair[1]
                         )
                     )
-        #print("Aaru {}".format(terms))
-        return cleaned_log, terms
 
-    def group_log_index(self, attributes: pd.DataFrame, by: np.array) -> pd.DataFrame:
-        """Groups log attributes (DataFrame) by a list of its fields.
+    def apply(self, loglines: pd.Series, num_workers: int = 1, chunk_size: int = 0):
+        """Cleans the loglines.
 
-        :param attributes: The log attribute data to be grouped.
-        :param by: A list of fields of the log attribute DataFrame object to group by.
-        :return: The log attribute data after grouping.
+        :param loglines: The raw loglines data to be cleaned.
+        :param num_workers: The number of processes cleaning chunks of the loglines in parallel.
+        :param chunk_size: The number of loglines per chunk, 0 splits them evenly among the workers.
+        :return: The cleaned loglines and the terms found by each replace pattern.
         """
-        attributes["group_index"] = attributes.index
-        group_index_list = (
-            attributes.groupby(by=by).group_index.apply(np.array).reset_index()
+        if not self.steps:
+            return loglines, pd.DataFrame()
+        values = loglines.tolist()
+        chunk_size = chunk_size or -(-len(values) // max(num_workers, 1))
+        if num_workers > 1 and len(values) > chunk_size:
+            chunks = [values[i : i + chunk_size] for i in range(0, len(values), chunk_size)]
+            with multiprocessing.Pool(processes=num_workers) as pool:
+                results = pool.map(self.clean_values, chunks)
+            lines = [line for chunk_lines, _ in results for line in chunk_lines]
+            terms = {
+                name: [found for _, chunk_terms in results for found in chunk_terms[name]]
+                for name in results[0][1]
+            }
+        else:
+            lines, terms = self.clean_values(values)
+
+        cleaned_log = pd.Series(
+            lines, index=loglines.index, name=loglines.name, dtype=loglines.dtype
+        )
+        if not self.has_terms:
+            return cleaned_log, pd.DataFrame()
+        return cleaned_log, pd.DataFrame(
+            {name: _terms_array(found, loglines.dtype) for name, found in terms.items()},
+            index=loglines.index,
         )
 
-        return group_index_list
+    def clean_values(self, values: list):
+        """Cleans a list of loglines.
+
+        :param values: The raw loglines.
+        :return: The cleaned loglines and a dictionary of the terms lists found by each replace pattern.
+        """
+        # Series.replace keeps non-strings, and str.findall maps them to missing values.
+        positions = [i for i, line in enumerate(values) if isinstance(line, str)]
+        lines = values if len(positions) == len(values) else [values[i] for i in positions]
+
+        terms = {}
+        for regex, repl, collect, message in self.steps:
+            try:
+                if not regex.pattern:
+                    # Series.replace treats an empty pattern as the exact value "".
+                    if collect:
+                        terms[repl] = [regex.findall(line) for line in lines]
+                    lines = [repl if line == "" else line for line in lines]
+                elif collect:
+                    # A later pattern with the same replacement overwrites the terms.
+                    found = terms[repl] = []
+                    matches = []
+                    replace = _recording_replacement(regex, repl, matches.append)
+                    cleaned = []
+                    for line in lines:
+                        start = len(matches)
+                        cleaned.append(regex.sub(replace, line))
+                        found.append(matches[start:])
+                    lines = cleaned
+                else:
+                    lines = [regex.sub(repl, line) for line in lines]
+            except:
+                raise RuntimeError(message)
+
+        if len(positions) != len(values):
+            missing = [line if pd.isna(line) else np.nan for line in values]
+            lines = _scatter(lines, positions, values)
+            terms = {name: _scatter(found, positions, missing) for name, found in terms.items()}
+        return lines, terms
+
+
+def _recording_replacement(regex, repl: str, append):
+    """Returns a replacement function for `regex.sub` that also passes each match to `append` as
+    `regex.findall` gives it: the whole match without groups, the group with one group and the tuple
+    of groups otherwise, unmatched groups being empty strings."""
+    if "\\" in repl:
+        # The replacement refers to groups or escapes.
+        if regex.groups == 0:
+            term = lambda m: m.group()
+        elif regex.groups == 1:
+            term = lambda m: m.group(1) or ""
+        else:
+            term = lambda m: m.groups("")
+
+        # Match.expand parses the replacement on every call, and logs repeat the same matches.
+        expanded = {}
+
+        def replace(m):
+            append(term(m))
+            key = (m.group(), m.groups())
+            if key not in expanded:
+                expanded[key] = m.expand(repl)
+            return expanded[key]
+
+    elif regex.groups == 0:
+
+        def replace(m):
+            append(m.group())
+            return repl
+
+    elif regex.groups == 1:
+
+        def replace(m):
+            append(m.group(1) or "")
+            return repl
+
+    else:
+
+        def replace(m):
+            append(m.groups(""))
+            return repl
+
+    return replace
+
+
+def _scatter(items: list, positions: list, default: list) -> list:
+    """Puts the items at the positions of a copy of the default list."""
+    result = list(default)
+    for i, item in zip(positions, items):
+        result[i] = item
+    return result
+
+def _terms_array(values: list, dtype):
+    """Builds the array str.findall gives for loglines of the given dtype: Arrow lists for Arrow-backed
+    strings, and Python lists otherwise."""
+    if isinstance(dtype, pd.ArrowDtype):
+        import pyarrow as pa
 
-    def identify_timestamps(self, logrecord: LogRecordObject):
-        pass
+        return pd.arrays.ArrowExtensionArray(pa.chunked_array([pa.array(values, from_pandas=True)]))
+    return pd.Series(values, dtype=object).values
@@ -0,0 +1,73 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+from collections import defaultdict
+
+import numpy as np
+
+
+class TemplateMatcher:
+    """
+    Classifies loglines into the known templates of a TemplateMiner without changing them. A logline
+    matches a template with as many tokens if all constant tokens of the template equal the tokens of
+    the logline at their positions, after the masking and tokenization of Drain. The templates are
+    indexed by their number of tokens and first token, and the loglines of each index key are compared
+    with the constants of its templates column by column. A logline matching several templates gets
+    the one with the most constant tokens.
+
+    :param miner: The TemplateMiner whose templates are matched.
+    """
+
+    def __init__(self, miner):
+        self.miner = miner
+        param_str = miner.drain.param_str
+        # (number of tokens, first token or None for a wildcard) -> [(cluster id, constants)]
+        self._templates = defaultdict(list)
+        for cluster in miner.drain.clusters:
+            tokens = list(cluster.log_template_tokens)
+            constants = [(j, t) for j, t in enumerate(tokens) if t != param_str]
+            first = tokens[0] if tokens and tokens[0] != param_str else None
+            self._templates[len(tokens), first].append((cluster.cluster_id, constants))
+
+    def __len__(self):
+        return sum(len(templates) for templates in self._templates.values())
+
+    def match(self, loglines: list) -> np.ndarray:
+        """
+        Matches loglines with the templates.
+
+        :param loglines: The loglines.
+        :return: The cluster id of the template of each logline, -1 for loglines matching none.
+        """
+        drain = self.miner.drain
+        tokens = [
+            drain.get_content_as_tokens(self.miner.masker.mask(line)) for line in loglines
+        ]
+        groups = defaultdict(list)
+        for i, line_tokens in enumerate(tokens):
+            groups[len(line_tokens), line_tokens[0] if line_tokens else None].append(i)
+
+        cluster_ids = np.full(len(loglines), -1, dtype=np.int64)
+        for (n_tokens, first), rows in groups.items():
+            candidates = self._templates.get((n_tokens, None), [])
+            if first is not None:
+                candidates = self._templates.get((n_tokens, first), []) + candidates
+            if not candidates:
+                continue
+            rows = np.array(rows)
+            values = np.empty((len(rows), n_tokens), dtype=object)
+            values[:] = [tokens[i] for i in rows]
+            unmatched = np.ones(len(rows), dtype=bool)
+            for cluster_id, constants in sorted(candidates, key=lambda c: -len(c[1])):
+                matched = unmatched.copy()
+                for j, t in constants:
+                    matched &= values[:, j] == t
+                cluster_ids[rows[matched]] = cluster_id
+                unmatched &= ~matched
+                if not unmatched.any():
+                    break
+        return cluster_ids
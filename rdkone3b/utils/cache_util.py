@@ -0,0 +1,207 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+import dataclasses
+import hashlib
+import json
+import os
+import uuid
+
+import pandas as pd
+
+CACHE_METADATA_KEY = b"rdkone3b.cache"
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_hash(fpath: str) -> str:
+    """
+    Hashes the content of a file.
+
+    :param fpath: The path to the file.
+    :return: The hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(fpath, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def config_hash(*configs) -> str:
+    """
+    Hashes configs. Dataclasses are hashed by their fields and other objects by their attributes, so two
+    configs with the same settings give the same hash.
+
+    :param configs: The config objects, dicts or values.
+    :return: The hex digest of the configs.
+    """
+    text = json.dumps(configs, sort_keys=True, default=_config_to_json)
+    return hashlib.sha256(text.encode("utf8")).hexdigest()
+
+
+def _config_to_json(obj):
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__dict__"):
+        return vars(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    return str(obj)
+
+
+class ParquetCache:
+    """
+    Disk cache of DataFrames stored as Parquet files, one per key. The modification time of a file is
+    its last use; once the cache takes more than `max_bytes`, the least recently used files are deleted.
+
+    :param cache_dir: The directory the cached files are stored in.
+    :param max_bytes: The maximum total size of the cached files.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "{}.parquet".format(key))
+
+    def get(self, key: str):
+        """
+        Reads a cached DataFrame.
+
+        :param key: The cache key.
+        :return: A tuple of the DataFrame and the metadata dict stored with it, None if not cached. Files
+            that cannot be read as a cached DataFrame are deleted and count as not cached.
+        """
+        import pyarrow.parquet as pq
+
+        fpath = self.path(key)
+        try:
+            table = pq.read_table(fpath)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # A truncated or foreign file, pyarrow.lib.ArrowInvalid is a ValueError.
+            self._discard(fpath)
+            return None
+        metadata = table.schema.metadata or {}
+        if CACHE_METADATA_KEY not in metadata:
+            self._discard(fpath)
+            return None
+        os.utime(fpath)
+        stored = json.loads(metadata[CACHE_METADATA_KEY])
+        return _table_to_dataframe(table, stored["columns"], stored["dtypes"]), stored["metadata"]
+
+    def put(self, key: str, data: pd.DataFrame, metadata: dict = None):
+        """
+        Caches a DataFrame, then evicts the least recently used files above the size cap.
+
+        :param key: The cache key.
+        :param data: The DataFrame, whose index and dtypes are kept.
+        :param metadata: A JSON serializable dict stored with the DataFrame.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        dtypes = _extension_dtypes(data)
+        # Arrow-backed columns are stored as is and left out of the pandas metadata, which cannot
+        # restore their dtypes.
+        arrow_columns = [name for name, dtype in dtypes.items() if dtype == "arrow"]
+        table = pa.Table.from_pandas(data.drop(columns=arrow_columns), preserve_index=True)
+        for name in arrow_columns:
+            table = table.append_column(name, pa.array(data[name].array))
+        schema_metadata = dict(table.schema.metadata or {})
+        stored = {"metadata": metadata or {}, "columns": list(data.columns), "dtypes": dtypes}
+        schema_metadata[CACHE_METADATA_KEY] = json.dumps(stored).encode("utf8")
+        table = table.replace_schema_metadata(schema_metadata)
+
+        # Written aside and renamed, so that readers never see a partial file.
+        tmp_path = os.path.join(self.cache_dir, ".{}.tmp".format(uuid.uuid4().hex))
+        # Keeps the field names of Arrow list types, which would otherwise be read back as "element".
+        pq.write_table(table, tmp_path, use_compliant_nested_type=False)
+        os.replace(tmp_path, self.path(key))
+        self.evict()
+
+    @staticmethod
+    def _discard(fpath: str):
+        try:
+            os.remove(fpath)
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """Deletes the least recently used files until the cache fits in `max_bytes`."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".parquet"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, fpath in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._discard(fpath)
+            total -= size
+
+    def clear(self):
+        """Deletes all cached files."""
+        if os.path.isdir(self.cache_dir):
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and entry.name.endswith(".parquet"):
+                    os.remove(entry.path)
+
+
+def _extension_dtypes(data: pd.DataFrame) -> dict:
+    """Records the Arrow-backed and string columns and categories, whose dtypes are not restored from
+    the pandas metadata."""
+    dtypes = {}
+    for name, dtype in data.dtypes.items():
+        code = _dtype_code(dtype)
+        if code is not None:
+            dtypes[name] = code
+    return dtypes
+
+
+def _dtype_code(dtype):
+    if isinstance(dtype, pd.ArrowDtype):
+        return "arrow"
+    if isinstance(dtype, pd.StringDtype):
+        return "string[{}]".format(dtype.storage)
+    if isinstance(dtype, pd.CategoricalDtype):
+        code = _dtype_code(dtype.categories.dtype)
+        return None if code is None else "category:" + code
+    return None
+
+
+def _restore_dtype(values, code: str):
+    import pyarrow as pa
+
+    if code == "arrow":
+        return pd.arrays.ArrowExtensionArray(pa.array(values.tolist()))
+    if code.startswith("category:"):
+        categories = _restore_dtype(values.cat.categories, code[len("category:") :])
+        return values.cat.rename_categories(pd.Index(categories))
+    return values.astype(code)
+
+
+def _table_to_dataframe(table, columns: list, dtypes: dict) -> pd.DataFrame:
+    """Converts a cached table back to the DataFrame it was created from."""
+    import pyarrow as pa
+
+    arrow_columns = [name for name, dtype in dtypes.items() if dtype == "arrow"]
+    data = table.drop_columns(arrow_columns).to_pandas()
+    for name in columns:
+        if name in arrow_columns:
+            data[name] = pd.arrays.ArrowExtensionArray(table.column(name))
+        elif name in dtypes:
+            data[name] = _restore_dtype(data[name], dtypes[name])
+        elif pa.types.is_list(table.schema.field(name).type):
+            # Lists are read back as numpy arrays.
+            data[name] = [v.tolist() if v is not None else None for v in data[name]]
+    return data[columns]
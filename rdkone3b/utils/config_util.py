@@ -11,6 +11,8 @@ class Config(abc.ABC):
         """
         if config_dict is None:
             config_dict = {}
+        if isinstance(config_dict, cls):
+            return config_dict
 
         config = cls()
         for field in config.__dict__:
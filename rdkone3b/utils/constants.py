@@ -9,6 +9,9 @@ from enum import Enum
 
 UPLOAD_DIRECTORY = "./app_uploaded_files"
 MERGED_LOGS_DIRECTORY = "./app_uploaded_files/merged_logs"
+# Kept outside of UPLOAD_DIRECTORY, which is emptied when the GUI starts
+DRAIN_STATE_DIRECTORY = "./drain_state"
+PARSE_CACHE_DIRECTORY = "./parse_cache"
 
 DIGITS_SUB = "[DIGITS]"
 TIMESTAMP = "[TIMESTAMP]"
@@ -31,10 +34,28 @@ PARSED_LOGLINE_NAME = "parsed_logline"
 PARAMETER_LIST_NAME = "parameter_list"
 LOG_EVENTS = "log_events"
 LOG_TIMESTAMPS = "timestamp"
+LOG_TIMESTAMPS_NS = "timestamp_ns"
 SPAN_ID = "span_id"
 EVENT_INDEX = "event_index"
 LABELS = "labels"
 
+# Timestamp formats tried, in order, when the datetime format of a log is not configured
+DATETIME_FORMATS = [
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%y%m%d-%H:%M:%S.%f",
+    "%y%m%d-%H:%M:%S",
+    "%Y %b %d %H:%M:%S",
+    "%b %d %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+]
+
 # Counts
 LOG_COUNTS = "counts"
 
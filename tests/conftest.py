@@ -0,0 +1,62 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from rdkone3b.preprocess.log_parser import LogParser
+
+MESSAGES = [
+    "wifi_health: radio {} channel {} noise -{} dBm",
+    "client {:02x}:{:02x}:{:02x} connected to vap {}",
+    "Received beacon from ap-{} rssi -{}",
+    "failed to read Device.WiFi.SSID.{}.Status retry {}",
+    "wifi_api: sta {} steering from band {} to band {} reason {}",
+]
+
+
+def wifi_log_lines(n_lines: int, seed: int = 0, n_unique: int = None) -> list:
+    """WiFiLog lines, drawn from `n_unique` distinct messages if set."""
+    rng = random.Random(seed)
+
+    def message():
+        msg = rng.choice(MESSAGES)
+        return msg.format(*[rng.randint(0, 40) for _ in range(msg.count("{"))])
+
+    pool = [message() for _ in range(n_unique)] if n_unique else None
+    start = datetime(2025, 7, 26, 10, 0, 0)
+    return [
+        "{} WIFI.wifi {} {} {}".format(
+            (start + timedelta(seconds=i // 7)).strftime("%Y-%m-%dT%H:%M:%S"),
+            rng.choice(["INFO", "ERROR"]),
+            rng.randint(1000, 1003),
+            rng.choice(pool) if pool else message(),
+        )
+        for i in range(n_lines)
+    ]
+
+
+class DirLogParser(LogParser):
+    """LogParser reading the files of a given directory."""
+
+    def __init__(self, merged_logs_path, **kwargs):
+        super().__init__(**kwargs)
+        self.merged_logs_path = merged_logs_path
+
+
+@pytest.fixture
+def write_log(tmp_path):
+    """Writes lines to a file of the temporary directory, returning its path."""
+
+    def write(name: str, lines: list, newline: str = "\n"):
+        fpath = tmp_path / name
+        fpath.write_bytes("".join(line + newline for line in lines).encode("utf-8"))
+        return fpath
+
+    return write
@@ -0,0 +1,72 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+import pandas as pd
+import pytest
+
+from rdkone3b.preprocess.data_loader import DataLoaderConfig, FileDataLoader
+from rdkone3b.utils import constants
+
+LOG_FORMAT = "<DateTime> <Level> <Content>"
+
+
+def loader_config(**kwargs) -> DataLoaderConfig:
+    return DataLoaderConfig(
+        reader_args={"log_format": LOG_FORMAT},
+        dimensions={"body": ["Content"], "attributes": ["Level"]},
+        **kwargs,
+    )
+
+
+def test_invalid_utf8_is_replaced(tmp_path):
+    fpath = tmp_path / "driver.log"
+    fpath.write_bytes(
+        b"2025-07-26T10:00:00 INFO radio \xff\xfe up\n2025-07-26T10:00:01 INFO radio down\n"
+    )
+    record = FileDataLoader(str(fpath), loader_config()).load_data()
+    assert record.body[constants.LOGLINE_NAME].tolist() == ["radio �� up", "radio down"]
+
+
+def multiline_log_lines(n_lines):
+    lines = ["startup"]
+    for i in range(n_lines):
+        lines.append("2025-07-26T10:{:02d}:{:02d} {} radio {} state {}".format(
+            i // 60 % 60, i % 60, ("INFO", "WARN", "ERROR")[i % 3], i % 7, i))
+        if i % 5 == 0:
+            lines.append("frame:{}".format(i))
+        if i % 11 == 0:
+            lines.extend(["Traceback:", "frame:{}".format(i + 1)])
+    return lines
+
+
+@pytest.mark.parametrize("merge_continuation", [False, True])
+@pytest.mark.parametrize("range_size", [64, 1000])
+def test_byte_ranges_match_serial_load(tmp_path, merge_continuation, range_size):
+    fpath = tmp_path / "driver.log"
+    fpath.write_text("\n".join(multiline_log_lines(200)) + "\n")
+
+    loads = {}
+    for num_workers in (1, 2):
+        config = loader_config(
+            num_workers=num_workers,
+            range_size=range_size,
+            merge_continuation=merge_continuation,
+            reject_file=str(tmp_path / "rejected.{}.log".format(num_workers)),
+        )
+        loader = FileDataLoader(str(fpath), config)
+        record = loader.load_data()
+        rejected = (tmp_path / "rejected.{}.log".format(num_workers)).read_text()
+        loads[num_workers] = (record.to_dataframe(), loader.stats, rejected)
+
+    serial, parallel = loads[1], loads[2]
+    pd.testing.assert_frame_equal(parallel[0], serial[0])
+    assert parallel[1] == serial[1]
+    assert parallel[2] == serial[2]
+    assert serial[1].total_lines == 200 + 1 + 40 + 2 * 19
+    assert serial[1].parsed_lines == 200
+    assert serial[1].continuation_lines == (78 if merge_continuation else 0)
+    assert serial[1].rejected_lines == 79 - serial[1].continuation_lines
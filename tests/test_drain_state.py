@@ -0,0 +1,85 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+import pytest
+
+from conftest import DirLogParser, wifi_log_lines
+from rdkone3b.utils import constants
+
+FILENAME = "WiFiLog.txt.0"
+
+
+class Interrupted(Exception):
+    pass
+
+
+class InterruptedLogParser(DirLogParser):
+    """LogParser failing once `stop_after` loglines are accounted for in the Drain state."""
+
+    def __init__(self, merged_logs_path, stop_after, **kwargs):
+        super().__init__(merged_logs_path, **kwargs)
+        self.stop_after = stop_after
+
+    def _mined(self, n_lines):
+        super()._mined(n_lines)
+        if n_lines == self.stop_after:
+            raise Interrupted()
+
+
+def clusters(parser) -> dict:
+    return {c.get_template(): c.size for c in parser.miner.drain.clusters}
+
+
+@pytest.fixture
+def log_dir(tmp_path, write_log):
+    write_log(FILENAME, wifi_log_lines(400, n_unique=120))
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"deduplicate": True}, {"deduplicate": True, "match_only": True}, {"match_only": True}],
+    ids=str,
+)
+def test_interrupted_parse_resumes_after_checkpoint(log_dir, options):
+    expected = DirLogParser(str(log_dir), state_dir=str(log_dir / "expected"), **options)
+    expected.parse_logs(FILENAME)
+
+    state_dir = str(log_dir / "state")
+    with pytest.raises(Interrupted):
+        InterruptedLogParser(
+            str(log_dir), 70, state_dir=state_dir, checkpoint_interval=25, **options
+        ).parse_logs(FILENAME)
+    resumed = DirLogParser(str(log_dir), state_dir=state_dir, checkpoint_interval=25, **options)
+    resumed.parse_logs(FILENAME)
+
+    assert clusters(resumed) == clusters(expected)
+    assert sum(clusters(resumed).values()) == 400
+    if options.get("deduplicate"):
+        assert resumed.result_table[constants.PARSED_LOGLINE_NAME].tolist() == (
+            expected.result_table[constants.PARSED_LOGLINE_NAME].tolist()
+        )
+
+
+def test_parsing_a_file_again_does_not_count_it_twice(log_dir):
+    state_dir = str(log_dir / "state")
+    first = DirLogParser(str(log_dir), state_dir=state_dir, deduplicate=True)
+    first.parse_logs(FILENAME)
+    again = DirLogParser(str(log_dir), state_dir=state_dir, deduplicate=True)
+    again.parse_logs(FILENAME)
+    assert clusters(again) == clusters(first)
+    assert again.result_table[constants.PARSED_LOGLINE_NAME].tolist() == (
+        first.result_table[constants.PARSED_LOGLINE_NAME].tolist()
+    )
+
+
+def test_cold_start_discards_the_progress(log_dir):
+    state_dir = str(log_dir / "state")
+    DirLogParser(str(log_dir), state_dir=state_dir).parse_logs(FILENAME)
+    parser = DirLogParser(str(log_dir), state_dir=state_dir)
+    parser.parse_logs(FILENAME, cold_start=True)
+    assert sum(clusters(parser).values()) == 400
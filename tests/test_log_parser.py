@@ -0,0 +1,56 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+import pandas as pd
+import pytest
+
+from conftest import DirLogParser, wifi_log_lines
+from rdkone3b.utils import constants
+
+FILENAME = "WiFiLog.txt.0"
+
+
+class EncodedLogParser(DirLogParser):
+    """LogParser loading a categorical body with some null loglines and an unused category."""
+
+    def _load_data(self, filename):
+        logrecord = super()._load_data(filename)
+        logrecord.body.loc[logrecord.body.index % 13 == 5, constants.LOGLINE_NAME] = None
+        logrecord.encode_body()
+        logline = logrecord.body[constants.LOGLINE_NAME]
+        logrecord.body[constants.LOGLINE_NAME] = logline.cat.add_categories(["unused logline"])
+        return logrecord
+
+
+class PerLineLogParser(EncodedLogParser):
+    """LogParser mining every logline, reporting the final template of its cluster."""
+
+    def _parse(self, log_lines):
+        cluster_ids = [self.miner.add_log_message(line)["cluster_id"] for line in log_lines]
+        return pd.Series(
+            [self.miner.drain.id_to_cluster[c].get_template() for c in cluster_ids],
+            index=log_lines.index,
+        )
+
+
+def clusters(parser) -> dict:
+    return {c.get_template(): c.size for c in parser.miner.drain.clusters}
+
+
+@pytest.mark.parametrize("n_unique", [None, 60])
+def test_deduplicate_matches_per_line_parse(tmp_path, write_log, n_unique):
+    write_log(FILENAME, wifi_log_lines(500, n_unique=n_unique))
+    expected = PerLineLogParser(str(tmp_path))
+    expected.parse_logs(FILENAME)
+    deduplicated = EncodedLogParser(str(tmp_path), deduplicate=True)
+    deduplicated.parse_logs(FILENAME)
+
+    assert clusters(deduplicated) == clusters(expected)
+    assert sum(clusters(deduplicated).values()) == 500 - 39
+    parsed = deduplicated.result_table[constants.PARSED_LOGLINE_NAME]
+    pd.testing.assert_series_equal(parsed, expected.result_table[constants.PARSED_LOGLINE_NAME])
+    assert parsed.isna().sum() == 39
@@ -0,0 +1,45 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from rdkone3b.preprocess.data_model import LogRecordObject
+from rdkone3b.utils import constants
+
+BODY_DTYPES = [
+    object,
+    "string[python]",
+    "string[pyarrow]",
+    pd.ArrowDtype(pa.string()),
+    "category",
+    pd.CategoricalDtype(pd.Index(["a b", "c d"], dtype="string[pyarrow]")),
+]
+
+
+def log_record(body_dtype) -> LogRecordObject:
+    index = pd.Index([3, 5, 8])
+    body = pd.DataFrame({constants.LOGLINE_NAME: ["a b", "c d", "a b"]}, index=index)
+    attributes = pd.DataFrame({"Level": ["INFO", "ERROR", "INFO"]}, index=index)
+    return LogRecordObject(
+        body=body.astype({constants.LOGLINE_NAME: body_dtype}), attributes=attributes
+    )
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+@pytest.mark.parametrize("memory_map", [True, False])
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("body_dtype", BODY_DTYPES, ids=str)
+def test_save_and_load_keep_dtypes(tmp_path, suffix, memory_map, lazy, body_dtype):
+    record = log_record(body_dtype)
+    fpath = str(tmp_path / ("record" + suffix))
+    record.save(fpath)
+    loaded = LogRecordObject.load(fpath, memory_map=memory_map, lazy=lazy)
+    pd.testing.assert_frame_equal(loaded.body, record.body)
+    pd.testing.assert_frame_equal(loaded.attributes, record.attributes)
+    pd.testing.assert_frame_equal(loaded.to_dataframe(), record.to_dataframe())
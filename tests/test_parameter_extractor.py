@@ -0,0 +1,69 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+import pandas as pd
+import pytest
+from drain3 import TemplateMiner
+from drain3.masking import MaskingInstruction
+from drain3.template_miner_config import TemplateMinerConfig
+
+from rdkone3b.preprocess.parameter_extractor import ParameterExtractor
+
+
+def plain_config():
+    return TemplateMinerConfig()
+
+
+def masked_config():
+    config = TemplateMinerConfig()
+    config.drain_extra_delimiters = [":"]
+    config.masking_instructions = [
+        MaskingInstruction(r"-\d+", "NEG"),
+        MaskingInstruction(r"ap-\d+", "AP"),
+    ]
+    return config
+
+
+def drain_parameters(miner, lines, templates):
+    return [
+        miner.get_parameter_list(t, line) if isinstance(t, str) else []
+        for t, line in zip(templates, lines)
+    ]
+
+
+def mine(config, lines):
+    miner = TemplateMiner(config=config)
+    templates = [miner.add_log_message(line)["template_mined"] for line in lines]
+    return miner, templates
+
+
+LINES = {
+    "aligned": ["conn 12 closed", "conn 13 closed", "conn 14 closed"],
+    # No line of the template lines up with it, all fall back to drain3.
+    "all unaligned": ["conn 12 closed ", "conn 13 closed ", " conn 14 closed"],
+    "some unaligned": ["conn 12 closed", " conn 13 closed", "conn 14 closed  "],
+    "short tokens": ["retry 1 of 1", "retry 2 of 1", "retry 1 of 3"],
+    "masks": ["noise -12 dBm ap-3", "noise -40 dBm ap-7", "rssi: -3 from ap-12"],
+}
+
+
+@pytest.mark.parametrize("config", [plain_config, masked_config])
+@pytest.mark.parametrize("case", sorted(LINES))
+def test_same_parameters_as_drain3(config, case):
+    lines = LINES[case]
+    miner, templates = mine(config(), lines)
+    parameters = ParameterExtractor(miner).extract(pd.Series(lines), pd.Series(templates))
+    assert parameters == drain_parameters(miner, lines, templates)
+
+
+def test_final_templates_and_null_rows():
+    lines = ["conn 12 closed ", "conn 13 closed ", None, "conn 14 closed "]
+    miner, _ = mine(plain_config(), [line for line in lines if line is not None])
+    templates = ["conn <*> closed", "conn <*> closed", None, "conn <*> closed"]
+    parameters = ParameterExtractor(miner).extract(pd.Series(lines), pd.Series(templates))
+    assert parameters == drain_parameters(miner, lines, templates)
+    assert parameters[2] == []
@@ -0,0 +1,77 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+import numpy as np
+import pandas as pd
+import pytest
+
+from rdkone3b.preprocess.preprocessor import Preprocessor, PreprocessorConfig
+from rdkone3b.utils import constants
+
+LINES = [
+    "2025-07-26T10:00:00 client 0a:1b:2c joined vap 3 band 5",
+    "retry 2 of 3 for Device.WiFi.SSID.4.Status=up",
+    "",
+    None,
+    "key=value, other=thing [band 24]",
+    np.nan,
+    "xx no digits here",
+    "ab ab abab b a 12.5 7.",
+]
+
+CONFIGS = {
+    "delimiters": {"custom_delimiters_regex": [r"[\[\]=,]", r"\s{2,}"]},
+    "no group": {"custom_replace_list": [[r"\d+", "<num>"]]},
+    "one group": {"custom_replace_list": [[r"band (\d+)", "<band>"]]},
+    "groups": {"custom_replace_list": [[r"(\d+)\.(\d+)?", "<float>"], [r"(a)|(b)", "<ab>"]]},
+    "backreferences": {
+        "custom_replace_list": [[r"(\w+)=(\w+)", r"\2:\1"], [r"retry (\d+)", r"<retry \g<1>/\g<0>>"]]
+    },
+    "escapes": {"custom_replace_list": [[r"vap \d", r"vap\tN"]]},
+    "empty matches": {"custom_replace_list": [[r"x*", "-"]]},
+    "empty pattern": {"custom_replace_list": [["", "<empty>"]]},
+    "same replacement": {"custom_replace_list": [[r"\d+", "<v>"], [r"[a-f]{2}", "<v>"]]},
+    "delimiters and patterns": {
+        "custom_delimiters_regex": [r"[=,]"],
+        "custom_replace_list": [[r"([0-9a-f]{2}:){2}[0-9a-f]{2}", "<mac>"], [r"\d+", "<num>"]],
+    },
+}
+
+
+def former_clean_log(config: PreprocessorConfig, loglines: pd.Series):
+    """Preprocessor.clean_log before the CleaningPlan, pattern by pattern over the whole column."""
+    cleaned_log = loglines
+    terms = pd.DataFrame()
+    for reg in config.custom_delimiters_regex or []:
+        cleaned_log = cleaned_log.replace(to_replace=reg, value=" ", regex=True)
+    for pattern, replacement in config.custom_replace_list or []:
+        terms[replacement] = cleaned_log.str.findall(pat=pattern)
+        cleaned_log = cleaned_log.replace(to_replace=pattern, value=replacement, regex=True)
+    return cleaned_log, terms
+
+
+@pytest.mark.parametrize("case", sorted(CONFIGS))
+@pytest.mark.parametrize("lines", ["strings", "with nulls"])
+def test_same_output_as_replace_and_findall(case, lines):
+    values = [line for line in LINES if isinstance(line, str)] if lines == "strings" else LINES
+    loglines = pd.Series(values, index=np.arange(len(values)) * 3, name=constants.LOGLINE_NAME)
+    config = PreprocessorConfig.from_dict(CONFIGS[case])
+    expected_log, expected_terms = former_clean_log(config, loglines)
+    cleaned_log, terms = Preprocessor(config).clean_log(loglines)
+    pd.testing.assert_series_equal(cleaned_log, expected_log)
+    pd.testing.assert_frame_equal(terms, expected_terms)
+
+
+@pytest.mark.parametrize("chunk_size", [0, 7])
+def test_pool_matches_serial(chunk_size):
+    loglines = pd.Series(LINES * 20, name=constants.LOGLINE_NAME)
+    config = dict(CONFIGS["delimiters and patterns"], chunk_size=chunk_size)
+    serial_log, serial_terms = Preprocessor(PreprocessorConfig.from_dict(config)).clean_log(loglines)
+    config["num_workers"] = 2
+    pool_log, pool_terms = Preprocessor(PreprocessorConfig.from_dict(config)).clean_log(loglines)
+    pd.testing.assert_series_equal(pool_log, serial_log)
+    pd.testing.assert_frame_equal(pool_terms, serial_terms)
@@ -0,0 +1,50 @@
+#
+# Copyright (c) 2023 Salesforce.com, inc.
+# All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+# For full license text, see the LICENSE file in the repo root or https://opensource.org/licenses/BSD-3-Clause
+#
+#
+import numpy as np
+import pandas as pd
+
+from rdkone3b.preprocess.data_loader import DataLoaderConfig, FileDataLoader
+from rdkone3b.preprocess.preprocessor import TimestampParser
+from rdkone3b.utils import constants
+
+
+def test_mixed_offsets_are_converted_to_utc():
+    timestamps = pd.Series(["2024-03-31T01:59:59+01:00", "2024-03-31T03:00:00+02:00", "garbage"])
+    parsed = TimestampParser().parse(timestamps)
+    expected = pd.to_datetime(["2024-03-31T00:59:59", "2024-03-31T01:00:00", None])
+    assert parsed[constants.LOG_TIMESTAMPS].tolist() == expected.tolist()
+    assert parsed[constants.LOG_TIMESTAMPS_NS].dtype == np.int64
+
+
+def test_naive_timestamps_keep_their_wall_clock_time():
+    parsed = TimestampParser().parse(pd.Series(["2024-03-31 02:30:00", "2024-03-31 02:30:00"]))
+    assert parsed[constants.LOG_TIMESTAMPS].tolist() == [pd.Timestamp("2024-03-31 02:30:00")] * 2
+
+
+def test_undetected_format_keeps_strings():
+    timestamps = pd.Series(["[  12.345]", "[  13.100]"])
+    parsed = TimestampParser().parse(timestamps)
+    assert parsed[constants.LOG_TIMESTAMPS].tolist() == timestamps.tolist()
+    assert constants.LOG_TIMESTAMPS_NS not in parsed
+
+
+def test_load_data_across_daylight_saving_time(tmp_path):
+    fpath = tmp_path / "dst.log"
+    fpath.write_text(
+        "2024-03-31T01:59:59+01:00 INFO before the change\n"
+        "2024-03-31T03:00:00+02:00 INFO after the change\n"
+    )
+    config = DataLoaderConfig(
+        reader_args={"log_format": "<DateTime> <Level> <Content>"},
+        dimensions={"timestamp": ["DateTime"], "body": ["Content"]},
+    )
+    record = FileDataLoader(str(fpath), config).load_data()
+    assert record.timestamp[constants.LOG_TIMESTAMPS].tolist() == [
+        pd.Timestamp("2024-03-31 00:59:59"),
+        pd.Timestamp("2024-03-31 01:00:00"),
+    ]